@@ -1,10 +1,43 @@
 import json
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from utils.abi import AbiCache
 
 with open("data/rpc.json") as file:
     RPC = json.load(file)
 
-with open("data/abi/erc20_abi.json") as file:
-    ERC20_ABI = json.load(file)
+ABI_CACHE_PATH = "data/abi_cache.json"
+
+# ABIs are parsed on first access, see __getattr__ below
+ABI_FILES = {
+    "ERC20_ABI": "data/abi/erc20_abi.json",
+    "DEPOSIT_ABI": "data/abi/bridge/deposit.json",
+    "WITHDRAW_ABI": "data/abi/bridge/withdraw.json",
+    "ORACLE_ABI": "data/abi/bridge/oracle.json",
+    "L1_FEE_ORACLE_ABI": "data/abi/l1_fee_oracle/abi.json",
+    "WETH_ABI": "data/abi/scroll/weth.json",
+    "SYNCSWAP_ROUTER_ABI": "data/abi/syncswap/router.json",
+    "SYNCSWAP_CLASSIC_POOL_ABI": "data/abi/syncswap/classic_pool.json",
+    "SYNCSWAP_CLASSIC_POOL_DATA_ABI": "data/abi/syncswap/classic_pool_data.json",
+    "SKYDROME_ROUTER_ABI": "data/abi/skydrome/abi.json",
+    "ZEBRA_ROUTER_ABI": "data/abi/zebra/abi.json",
+    "AAVE_ABI": "data/abi/aave/abi.json",
+    "LAYERBANK_ABI": "data/abi/layerbank/abi.json",
+    "ZERIUS_ABI": "data/abi/zerius/abi.json",
+    "L2PASS_ABI": "data/abi/l2pass/abi.json",
+    "DMAIL_ABI": "data/abi/dmail/abi.json",
+    "OMNISEA_ABI": "data/abi/omnisea/abi.json",
+    "NFTS2ME_ABI": "data/abi/nft2me/abi.json",
+    "SAFE_ABI": "data/abi/gnosis/abi.json",
+    "DEPLOYER_ABI": "data/deploy/abi.json",
+    "ZKSTARS_ABI": "data/abi/zkstars/abi.json",
+    "RUBYSCORE_VOTE_ABI": "data/abi/rubyscore/abi.json",
+    "L2TELEGRAPH_MESSAGE_ABI": "data/abi/l2telegraph/send_message.json",
+    "L2TELEGRAPH_NFT_ABI": "data/abi/l2telegraph/bridge_nft.json",
+    "NFT_ORIGINS_ABI": "data/abi/nft-origins/abi.json",
+}
+ABI_CACHE = AbiCache(ABI_CACHE_PATH)
 
 with open("data/wallets.txt", "r") as file:
     WALLETS = file.read().splitlines()
@@ -12,75 +45,6 @@ with open("data/wallets.txt", "r") as file:
 with open("data/okx_addresses.txt", "r") as file:
     OKX_ADDRESSES = file.read().splitlines()
 
-with open("data/abi/bridge/deposit.json") as file:
-    DEPOSIT_ABI = json.load(file)
-
-with open("data/abi/bridge/withdraw.json") as file:
-    WITHDRAW_ABI = json.load(file)
-
-with open("data/abi/bridge/oracle.json") as file:
-    ORACLE_ABI = json.load(file)
-
-with open("data/abi/scroll/weth.json") as file:
-    WETH_ABI = json.load(file)
-
-with open("data/abi/syncswap/router.json", "r") as file:
-    SYNCSWAP_ROUTER_ABI = json.load(file)
-
-with open("data/abi/syncswap/classic_pool.json") as file:
-    SYNCSWAP_CLASSIC_POOL_ABI = json.load(file)
-
-with open("data/abi/syncswap/classic_pool_data.json") as file:
-    SYNCSWAP_CLASSIC_POOL_DATA_ABI = json.load(file)
-
-with open("data/abi/skydrome/abi.json", "r") as file:
-    SKYDROME_ROUTER_ABI = json.load(file)
-
-with open("data/abi/zebra/abi.json", "r") as file:
-    ZEBRA_ROUTER_ABI = json.load(file)
-
-with open("data/abi/aave/abi.json", "r") as file:
-    AAVE_ABI = json.load(file)
-
-with open("data/abi/layerbank/abi.json", "r") as file:
-    LAYERBANK_ABI = json.load(file)
-
-with open("data/abi/zerius/abi.json", "r") as file:
-    ZERIUS_ABI = json.load(file)
-
-with open("data/abi/l2pass/abi.json", "r") as file:
-    L2PASS_ABI = json.load(file)
-
-with open("data/abi/dmail/abi.json", "r") as file:
-    DMAIL_ABI = json.load(file)
-
-with open("data/abi/omnisea/abi.json", "r") as file:
-    OMNISEA_ABI = json.load(file)
-
-with open("data/abi/nft2me/abi.json", "r") as file:
-    NFTS2ME_ABI = json.load(file)
-
-with open("data/abi/gnosis/abi.json", "r") as file:
-    SAFE_ABI = json.load(file)
-
-with open("data/deploy/abi.json", "r") as file:
-    DEPLOYER_ABI = json.load(file)
-
-with open("data/abi/zkstars/abi.json", "r") as file:
-    ZKSTARS_ABI = json.load(file)
-
-with open("data/abi/rubyscore/abi.json", "r") as file:
-    RUBYSCORE_VOTE_ABI = json.load(file)
-
-with open("data/abi/l2telegraph/send_message.json", "r") as file:
-    L2TELEGRAPH_MESSAGE_ABI = json.load(file)
-
-with open("data/abi/l2telegraph/bridge_nft.json", "r") as file:
-    L2TELEGRAPH_NFT_ABI = json.load(file)
-
-with open("data/abi/nft-origins/abi.json", "r") as file:
-    NFT_ORIGINS_ABI = json.load(file)
-
 
 class AutomaticMode:
     def __init__(self, value: bool) -> None:
@@ -95,66 +59,214 @@ class AutomaticMode:
 
 AUTOMATIC_MODE = AutomaticMode(False)
 
+# addresses below are checksummed already and are used as they are
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
-BRIDGE_CONTRACTS = {
-    "deposit": "0xf8b1378579659d8f7ee5f3c929c2f3e332e41fd6",
-    "withdraw": "0x4C0926FF5252A435FD19e10ED15e5a249Ba19d79",
-    "oracle": "0x987e300fDfb06093859358522a79098848C33852",
-}
-
-ORBITER_CONTRACT = "0x80c67432656d59144ceff962e8faf8926599bcf8"
-
-SCROLL_TOKENS = {
-    "ETH": "0x5300000000000000000000000000000000000004",
-    "WETH": "0x5300000000000000000000000000000000000004",
-    "USDT": "0xf55BEC9cafDbE8730f096Aa55dad6D22d44099Df",
-    "USDC": "0x06eFdBFf2a14a7c8E15944D1F4A48F9F95F663A4",
-}
+BRIDGE_CONTRACTS = MappingProxyType(
+    {
+        "deposit": "0xF8B1378579659D8F7EE5f3C929c2f3E332E41Fd6",
+        "withdraw": "0x4C0926FF5252A435FD19e10ED15e5a249Ba19d79",
+        "oracle": "0x987e300fDfb06093859358522a79098848C33852",
+        # ETH gateways behind the routers, they emit the finalize events
+        "eth_gateway_l1": "0x7F2b8C31F88B6006c382775eea88297Ec1e3E905",
+        "eth_gateway_l2": "0x6EA73e05AdC79974B931123675ea8F78FfdacDF0",
+    }
+)
+
+# topics of the events bridges pay out with, matched by LogWatcher
+BRIDGE_EVENT_TOPICS = MappingProxyType(
+    {
+        # FinalizeDepositETH(address indexed from, address indexed to, uint256 amount, bytes data)
+        "scroll_deposit": "0x9e86c356e14e24e26e3ce769bf8b87de38e0faa0ed0ca946fa09659aa606bd2d",
+        # FinalizeWithdrawETH(address indexed from, address indexed to, uint256 amount, bytes data)
+        "scroll_withdraw": "0x96db5d1cee1dd2760826bb56fabd9c9f6e978083e0a8b88559c741a29e9746e7",
+        # FundsDeposited(uint256 partnerId, uint256 amount, bytes32 destChainIdBytes,
+        # uint256 destAmount, uint256 depositId, address srcToken, address depositor,
+        # bytes recipient, bytes destToken) of the Nitro asset forwarder
+        "nitro_deposit": "0x6f223106c8e3df857d691613d18d1478cc7c629a1fdf16c7b461d36729fcc7ad",
+        # FundsPaid(bytes32 messageHash, address forwarder, uint256 nonce), nonce is the depositId
+        "nitro_payout": "0x0f3ca0b27903ec13ef88a7ea8be837cc19b0d7f71a735f2083215739a8004464",
+    }
+)
+
+# rollups charging an L1 data fee on top of L2 gas
+L1_FEE_ORACLES = MappingProxyType(
+    {
+        "scroll": "0x5300000000000000000000000000000000000002",
+        "optimism": "0x420000000000000000000000000000000000000F",
+        "base": "0x420000000000000000000000000000000000000F",
+    }
+)
+
+ORBITER_CONTRACT = "0x80C67432656d59144cEFf962E8fAF8926599bCF8"
+
+# Multicall3, zkSync Era has its own deployment
+MULTICALL_CONTRACTS = MappingProxyType(
+    {
+        "ethereum": "0xcA11bde05977b3631167028862bE2a173976CA11",
+        "arbitrum": "0xcA11bde05977b3631167028862bE2a173976CA11",
+        "optimism": "0xcA11bde05977b3631167028862bE2a173976CA11",
+        "zksync": "0xF9cda624FBC7e059355ce98a31693d299FACd963",
+        "base": "0xcA11bde05977b3631167028862bE2a173976CA11",
+        "scroll": "0xcA11bde05977b3631167028862bE2a173976CA11",
+        "linea": "0xcA11bde05977b3631167028862bE2a173976CA11",
+    }
+)
+
+
+@dataclass(frozen=True)
+class Token:
+    address: str
+    symbol: str
+    decimals: int
+    is_native: bool = False
+
+
+TOKENS = MappingProxyType(
+    {
+        # ETH is routed through the WETH address by the swap contracts
+        "ETH": Token("0x5300000000000000000000000000000000000004", "ETH", 18, True),
+        "WETH": Token("0x5300000000000000000000000000000000000004", "WETH", 18),
+        "USDT": Token("0xf55BEC9cafDbE8730f096Aa55dad6D22d44099Df", "USDT", 6),
+        "USDC": Token("0x06eFdBFf2a14a7c8E15944D1F4A48F9F95F663A4", "USDC", 6),
+    }
+)
+
+SCROLL_TOKENS = MappingProxyType(
+    {symbol: token.address for symbol, token in TOKENS.items()}
+)
+
+SYNCSWAP_CONTRACTS = MappingProxyType(
+    {
+        "router": "0x80e38291e06339d10AAB483C65695D004dBD5C69",
+        "classic_pool": "0x37BAc764494c8db4e54BDE72f6965beA9fa0AC2d",
+    }
+)
+
+SKYDROME_CONTRACTS = MappingProxyType(
+    {"router": "0xAA111C62cDEEf205f70E6722D1E22274274ec12F"}
+)
+
+ZEBRA_CONTRACTS = MappingProxyType(
+    {"router": "0x0122960d6e391478bfE8fB2408Ba412D5600f621"}
+)
+
+AMBIENT_CONTRACTS = MappingProxyType(
+    {
+        "router": "0xaaaaAAAACB71BF2C8CaE522EA5fa455571A74106",
+        "impact": "0xc2c301759B5e0C385a38e678014868A33E2F3ae3",
+    }
+)
+
+XYSWAP_CONTRACT = MappingProxyType(
+    {
+        "router": "0x22bf2A9fcAab9dc96526097318f459eF74277042",
+        "use_ref": True,  # If you use True, you support me 1% of the transaction amount
+    }
+)
+
+AAVE_CONTRACT = "0xFF75A4B698E3Ec95E608ac0f22A03B8368E05F5D"
+
+AAVE_WETH_CONTRACT = "0xf301805bE1Df81102C957f6d4Ce29d2B8c056B2a"
+
+LAYERBANK_CONTRACT = "0xEC53c830f4444a8A56455c6836b5D2aA794289Aa"
 
-SYNCSWAP_CONTRACTS = {
-    "router": "0x80e38291e06339d10aab483c65695d004dbd5c69",
-    "classic_pool": "0x37BAc764494c8db4e54BDE72f6965beA9fa0AC2d",
-}
-
-SKYDROME_CONTRACTS = {"router": "0xAA111C62cDEEf205f70E6722D1E22274274ec12F"}
-
-ZEBRA_CONTRACTS = {"router": "0x0122960d6e391478bfe8fb2408ba412d5600f621"}
-
-AMBIENT_CONTRACTS = {
-    "router": "0xaaaaaaaacb71bf2c8cae522ea5fa455571a74106",
-    "impact": "0xc2c301759B5e0C385a38e678014868A33E2F3ae3",
-}
+LAYERBANK_WETH_CONTRACT = "0x274C3795dadfEbf562932992bF241ae087e0a98C"
 
-XYSWAP_CONTRACT = {
-    "router": "0x22bf2a9fcaab9dc96526097318f459ef74277042",
-    "use_ref": True,  # If you use True, you support me 1% of the transaction amount
-}
+ZERIUS_CONTRACT = "0xEB22C3e221080eAD305CAE5f37F0753970d973Cd"
 
-AAVE_CONTRACT = "0xff75a4b698e3ec95e608ac0f22a03b8368e05f5d"
+DMAIL_CONTRACT = "0x47fbe95e981C0Df9737B6971B451fB15fdC989d9"
 
-AAVE_WETH_CONTRACT = "0xf301805be1df81102c957f6d4ce29d2b8c056b2a"
+OMNISEA_CONTRACT = "0x46Ce46951D12710d85bc4FE10BB29c6Ea5012077"
 
-LAYERBANK_CONTRACT = "0xec53c830f4444a8a56455c6836b5d2aa794289aa"
+SAFE_CONTRACT = "0xa6B71E26C5e0845f74c812102Ca7114b6a896AB2"
 
-LAYERBANK_WETH_CONTRACT = "0x274C3795dadfEbf562932992bF241ae087e0a98C"
+RUBYSCORE_VOTE_CONTRACT = "0xe10Add2ad591A7AC3CA46788a06290De017b9fB4"
 
-ZERIUS_CONTRACT = "0xeb22c3e221080ead305cae5f37f0753970d973cd"
+L2TELEGRAPH_MESSAGE_CONTRACT = "0x9F63DBdF90837384872828d1Ed6Eb424A7F7f939"
 
-DMAIL_CONTRACT = "0x47fbe95e981c0df9737b6971b451fb15fdc989d9"
+L2TELEGRAPH_NFT_CONTRACT = "0xDC60fd9d2A4ccF97f292969580874De69E6c326E"
 
-OMNISEA_CONTRACT = "0x46ce46951d12710d85bc4fe10bb29c6ea5012077"
+NFT_ORIGINS_CONTRACT = "0x74670A3998d9d6622E32D0847fF5977c37E0eC91"
 
-SAFE_CONTRACT = "0xa6b71e26c5e0845f74c812102ca7114b6a896ab2"
+L2PASS_CONTRACT = "0x0000049F63Ef0D60aBE49fdD8BEbfa5a68822222"
 
-RUBYSCORE_VOTE_CONTRACT = "0xe10Add2ad591A7AC3CA46788a06290De017b9fB4"
+SCROLL_FEE_INACCURACY = 0.00001
 
-L2TELEGRAPH_MESSAGE_CONTRACT = "0x9f63dbdf90837384872828d1ed6eb424a7f7f939"
+# revert reasons that fail the same way on every retry, other reverts are retried
+FATAL_REVERTS = (
+    "already minted",
+    "already claimed",
+    "already voted",
+    "max supply",
+    "sold out",
+    "not whitelisted",
+    "not eligible",
+    "caller is not the owner",
+)
+
+GAS_USAGE_PATH = "data/gas_usage.json"  # gas used by sent transactions per call
+GAS_USAGE_SAMPLES = 100  # newest receipts kept per (chain, contract, selector)
+GAS_USAGE_MIN_SAMPLES = 10  # receipts needed before the estimate is skipped
+GAS_USAGE_MARGIN = 0.1  # added on top of the 99th percentile of gas used
+GAS_USAGE_SAVE_EVERY = 20  # new receipts between writes of GAS_USAGE_PATH
+# gas used there includes an L1/pubdata part that follows L1 prices
+GAS_USAGE_EXCLUDED_CHAINS = ("arbitrum", "zksync")
+
+FEE_HISTORY_BLOCKS = 10  # recent blocks the priority fee percentile is taken from
+STUCK_TX_BLOCKS = 20  # blocks a transaction may stay pending before its fees are bumped
+FEE_BUMP_PERCENT = 15  # nodes accept a same-nonce replacement from +10-12.5% fees
+
+SCROLL_DEPOSIT_GAS_LIMIT = 168000  # L2 gas the relayed depositETH message is paid for
+SCROLL_DEPOSIT_FEE_MARGIN = 1.2  # deposit fee multiplier, the messenger refunds the excess
+SCROLL_WITHDRAW_GAS_LIMIT = 0  # withdrawals are finalized on L1, nothing is prepaid
+
+OKX_FEES_TTL = 10 * 60  # seconds before the OKX withdrawal fee table is reloaded
+OKX_SUBACCOUNTS_SWEEP_INTERVAL = 30 * 60  # minimal seconds between subaccount sweeps
+OKX_WITHDRAWAL_POLL_MIN = 5  # seconds between withdrawal status checks right after a change
+OKX_WITHDRAWAL_POLL_MAX = 60  # seconds between withdrawal status checks when nothing changes
+OKX_WITHDRAWAL_TIMEOUT = 2 * 60 * 60  # seconds a sent withdrawal may stay pending
+OKX_WITHDRAWAL_HISTORY_LIMIT = 100  # withdrawals per history request, the OKX maximum
+OKX_WITHDRAWAL_BALANCE_TIMEOUT = 60 * 60  # seconds a queued withdrawal waits for OKX funds
+OKX_FUNDING_BALANCE_POLL = 60  # seconds between funding balance checks while waiting
+OKX_WITHDRAWALS_PER_SECOND = 6  # OKX limit of POST /api/v5/asset/withdrawal per user
+
+MULTICALL_BATCH_SIZE = 500  # balance reads aggregated into one eth_call
+MULTICALLS_PER_REQUEST = 5  # aggregated eth_calls sent in one JSON-RPC batch
+PORTFOLIO_CSV_PATH = "data/portfolio.csv"  # output of the portfolio scanner
+PORTFOLIO_RETRIES = 4  # retries of failed scanner reads before they are left empty
+PORTFOLIO_RETRY_DELAY = 1  # seconds before the first retry, doubled on each next one
+
+LOG_WATCHER_LOOKBACK = 10 * 60  # seconds of blocks searched for a payout made before its watch
+LOG_WATCHER_MAX_BLOCKS = 1000  # block range of one eth_getLogs, public RPCs reject larger ones
+
+BRIDGE_ROUTES_TTL = 10 * 60  # seconds bridge routes and amount limits are reused
+BRIDGE_STATS_PATH = "data/bridge_stats.json"  # observed bridge settlement times
+BRIDGE_STATS_WEIGHT = 0.3  # weight of the newest settlement time in the average
+# typical gas of the source chain transaction of each bridge
+BRIDGE_GAS_LIMITS = {
+    "native": 150000,
+    "orbiter": 21000,
+    "layerswap": 21000,
+    "nitro": 120000,
+}
+# settlement seconds assumed until a bridge has been observed
+BRIDGE_DEFAULT_LATENCY = {
+    "native": {
+        "in": 20 * 60,
+        "out": 4 * 60 * 60,
+    },
+    "orbiter": 2 * 60,
+    "nitro": 2 * 60,
+    "layerswap": 5 * 60,
+}
 
-L2TELEGRAPH_NFT_CONTRACT = "0xdc60fd9d2a4ccf97f292969580874de69e6c326e"
 
-NFT_ORIGINS_CONTRACT = "0x74670A3998d9d6622E32D0847fF5977c37E0eC91"
+def __getattr__(name: str):
+    if name in ABI_FILES:
+        abi = ABI_CACHE.get(ABI_FILES[name])
+        globals()[name] = abi
 
-L2PASS_CONTRACT = "0x0000049f63ef0d60abe49fdd8bebfa5a68822222"
+        return abi
 
-SCROLL_FEE_INACCURACY = 0.00001
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -59,6 +59,7 @@ def get_module():
                 "Dmail sending mail": send_mail,
                 "Create gnosis safe": send_message,
                 "Deploy contract": deploy_contract,
+                "Portfolio scanner": "portfolio",
                 "Exit": "exit",
             }.items(),
             start=1,
@@ -133,9 +134,33 @@ def _generate_groups():
     return groups
 
 
+def plan_fleet():
+    """Registers the wallets of an automation run and plans their OKX withdrawals"""
+    from utils.fleet import FLEET
+    from utils.signer import SIGNER
+
+    config = MODULES_CONFIG[MODULES_NAMES.okx_withdraw]
+
+    FLEET.register([SIGNER.get_account(key).address for key in WALLETS])
+    FLEET.plan_okx_withdrawals(config["min_amount"], config["max_amount"])
+
+
 async def main(module):
     groups = _generate_groups()
 
+    if module is automatic:
+        plan_fleet()
+
+    if module is okx_withdraw or (
+        module is automatic and AUTOMATIC_CONFIG["okx_withdraw_enabled"]
+    ):
+        try:
+            await sweep_okx_subaccounts()
+        except Exception as e:
+            logger.warning(
+                f"OKX subaccount sweep before the run failed, withdrawals will retry it | {e}"
+            )
+
     start_id = 0
     tasks = []
     for id, group in enumerate(groups):
@@ -155,6 +180,45 @@ async def main(module):
 
     await asyncio.gather(*tasks)
 
+    from utils.gas_usage import GAS_USAGE
+
+    GAS_USAGE.save()
+
+    # ccxt is only imported by modules that talk to OKX
+    if "modules.okx" in sys.modules:
+        from modules.okx import close_okx_clients
+
+        await close_okx_clients()
+
+
+async def portfolio():
+    from utils.fleet import FLEET
+    from utils.portfolio import scan_portfolio
+    from utils.signer import SIGNER
+
+    addresses = [SIGNER.get_account(key).address for key in WALLETS]
+
+    FLEET.load(addresses, await scan_portfolio(addresses))
+
+    bridge_out = FLEET.plan_bridge_out(
+        AUTOMATIC_CONFIG["min_amount_leave_on_scroll"],
+        AUTOMATIC_CONFIG["max_amount_leave_on_scroll"],
+    )
+    src_tokens = FLEET.choose_src_tokens(
+        {
+            symbol: AUTOMATIC_CONFIG[f"min_balance_{symbol.lower()}"]
+            for symbol in ("ETH", "WETH", "USDC", "USDT")
+        }
+    )
+
+    logger.info(
+        f"Fleet plan | {(bridge_out > 0).sum()}/{len(addresses)} wallets can bridge out {bridge_out[bridge_out > 0].sum():.6f} ETH | "
+        + " | ".join(
+            f"first swap from {symbol}: {(src_tokens == symbol).sum()}"
+            for symbol in sorted(set(src_tokens))
+        )
+    )
+
 
 if __name__ == "__main__":
     logger.add(
@@ -166,4 +230,7 @@ if __name__ == "__main__":
     )
 
     module = get_module()
-    asyncio.run(main(module))
+    if module == "portfolio":
+        asyncio.run(portfolio())
+    else:
+        asyncio.run(main(module))
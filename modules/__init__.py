@@ -1,29 +1,43 @@
 import enum
+import importlib
 
-from .aave import Aave
-from .account import Account
-from .l2pass import L2Pass
-from .l2telegraph import L2Telegraph
-from .deploy import Deployer
-from .nftorigins import NftOrigins
-from .nitro import Nitro
-from .rubyscore import RubyScore
-from .safe import GnosisSafe
-from .scroll import Scroll
-from .orbiter import Orbiter
-from .layerswap import LayerSwap
-from .xyswap import XYSwap
-from .zebra import Zebra
-from .zkstars import ZkStars
-from .skydrome import Skydrome
-from .syncswap import SyncSwap
-from .layerbank import LayerBank
-from .zerius import Zerius
-from .dmail import Dmail
-from .omnisea import Omnisea
-from .nfts2me import Minter
-from .deploy import Deployer
-from .okx import OKX
+from config import (
+    SKYDROME_CONTRACTS,
+    SYNCSWAP_CONTRACTS,
+    XYSWAP_CONTRACT,
+    ZEBRA_CONTRACTS,
+)
+
+# class name -> submodule, imported on first access, so starting the CLI
+# does not pay for web3, ccxt and the ABIs of modules that are never run
+_CLASSES = {
+    "Aave": "aave",
+    "Account": "account",
+    "BridgeSelector": "bridge_selector",
+    "L2Pass": "l2pass",
+    "L2Telegraph": "l2telegraph",
+    "Deployer": "deploy",
+    "NftOrigins": "nftorigins",
+    "Nitro": "nitro",
+    "RubyScore": "rubyscore",
+    "GnosisSafe": "safe",
+    "Scroll": "scroll",
+    "Orbiter": "orbiter",
+    "LayerSwap": "layerswap",
+    "XYSwap": "xyswap",
+    "Zebra": "zebra",
+    "ZkStars": "zkstars",
+    "Skydrome": "skydrome",
+    "SyncSwap": "syncswap",
+    "LayerBank": "layerbank",
+    "Zerius": "zerius",
+    "Dmail": "dmail",
+    "Omnisea": "omnisea",
+    "Minter": "nfts2me",
+    "OKX": "okx",
+}
+
+__all__ = [*_CLASSES, "MODULES_NAMES", "AutomaticModules", "SWAP_MODULES"]
 
 
 class MODULES_NAMES(str, enum.Enum):
@@ -59,37 +73,76 @@ class MODULES_NAMES(str, enum.Enum):
     tx_checker = "tx_checker"
 
 
-SWAP_MODULES = {
-    MODULES_NAMES.swap_skydrome: {
-        "class": Skydrome,
-        "tokens": {
-            "ETH": ["USDC", "USDT"],
-            "USDC": ["ETH"],
-            "USDT": ["ETH"],
+class AutomaticModules(str, enum.Enum):
+    swaps = "swaps"
+    wrap_unwrap_eth = "wrap_unwrap_eth"
+    send_email = "send_email"
+    mint_l2pass = "mint_l2pass"
+    mint_bridge_l2_telegraph = "mint_l2_telegraph"
+    l2telegraph_send_message = "l2telegraph_send_message"
+    create_gnosis_safe = "create_gnosis_safe"
+    create_omnisea_collection = "create_omnisea_collection"
+    aave = "aave"
+    layerbank = "layerbank"
+    mint_nfts2me = "mint_nfts2me"
+    mint_zerius = "mint_zerius"
+    mint_zkstars = "mint_zkstars"
+    rubyscore_vote = "rubyscore_vote"
+    deploy_contract = "deploy_contract"
+    bridge_in = "bridge_in"
+    bridge_out = "bridge_out"
+
+
+def _swap_modules() -> dict:
+    return {
+        MODULES_NAMES.swap_skydrome: {
+            "class": __getattr__("Skydrome"),
+            "spender": SKYDROME_CONTRACTS["router"],
+            "tokens": {
+                "ETH": ["USDC", "USDT"],
+                "USDC": ["ETH"],
+                "USDT": ["ETH"],
+            },
         },
-    },
-    MODULES_NAMES.swap_zebra: {
-        "class": Zebra,
-        "tokens": {
-            "ETH": ["USDC", "USDT"],
-            "USDC": ["ETH"],
-            "USDT": ["ETH"],
+        MODULES_NAMES.swap_zebra: {
+            "class": __getattr__("Zebra"),
+            "spender": ZEBRA_CONTRACTS["router"],
+            "tokens": {
+                "ETH": ["USDC", "USDT"],
+                "USDC": ["ETH"],
+                "USDT": ["ETH"],
+            },
         },
-    },
-    MODULES_NAMES.swap_syncswap: {
-        "class": SyncSwap,
-        "tokens": {
-            "ETH": ["USDC", "USDT"],
-            "USDC": ["ETH"],
-            "USDT": ["ETH"],
+        MODULES_NAMES.swap_syncswap: {
+            "class": __getattr__("SyncSwap"),
+            "spender": SYNCSWAP_CONTRACTS["router"],
+            "tokens": {
+                "ETH": ["USDC", "USDT"],
+                "USDC": ["ETH"],
+                "USDT": ["ETH"],
+            },
         },
-    },
-    MODULES_NAMES.swap_xyswap: {
-        "class": XYSwap,
-        "tokens": {
-            "ETH": ["USDC", "WETH"],
-            "USDC": ["ETH"],
-            "WETH": ["ETH"],
+        MODULES_NAMES.swap_xyswap: {
+            "class": __getattr__("XYSwap"),
+            "spender": XYSWAP_CONTRACT["router"],
+            "tokens": {
+                "ETH": ["USDC", "WETH"],
+                "USDC": ["ETH"],
+                "WETH": ["ETH"],
+            },
         },
-    },
-}
+    }
+
+
+def __getattr__(name: str):
+    if name in _CLASSES:
+        module = importlib.import_module(f".{_CLASSES[name]}", __name__)
+        value = getattr(module, name)
+    elif name == "SWAP_MODULES":
+        value = _swap_modules()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+
+    return value
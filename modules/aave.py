@@ -52,9 +52,7 @@ class Aave(Account):
             tx_data = await self.get_tx_data(amount_wei)
 
             transaction = await self.contract.functions.depositETH(
-                self.w3.to_checksum_address(
-                    "0x11fCfe756c05AD438e312a7fd934381537D3cFfe"
-                ),
+                "0x11fCfe756c05AD438e312a7fd934381537D3cFfe",
                 self.address,
                 0,
             ).build_transaction(tx_data)
@@ -100,9 +98,7 @@ class Aave(Account):
                 tx_data = await self.get_tx_data()
 
                 transaction = await self.contract.functions.withdrawETH(
-                    self.w3.to_checksum_address(
-                        "0x11fCfe756c05AD438e312a7fd934381537D3cFfe"
-                    ),
+                    "0x11fCfe756c05AD438e312a7fd934381537D3cFfe",
                     amount,
                     self.address,
                 ).build_transaction(tx_data)
@@ -112,6 +108,8 @@ class Aave(Account):
                 txn_hash = await self.send_raw_transaction(signed_txn)
 
                 await self.wait_until_tx_finished(txn_hash.hex())
+
+                self.spend_allowance(amount, AAVE_WETH_CONTRACT, AAVE_CONTRACT)
             else:
                 logger.error(f"[{self.account_id}][{self.address}] Deposit not found")
                 raise ValueError("Deposit not found")
@@ -1,25 +1,51 @@
 import asyncio
 import time
 import random
+from functools import partial
 from typing import Optional, Union, Type, Any
 
 from hexbytes import HexBytes
 from loguru import logger
 from web3 import AsyncWeb3, Web3
-from eth_account import Account as EthereumAccount
+from eth_utils import function_abi_to_4byte_selector
 from web3.contract import Contract
-from web3.exceptions import TransactionNotFound
-from web3.middleware import async_geth_poa_middleware
-
-from config import RPC, ERC20_ABI, SCROLL_TOKENS, SCROLL_FEE_INACCURACY
+from web3.exceptions import (
+    ContractCustomError,
+    ContractLogicError,
+    TransactionNotFound,
+)
+from web3.logs import DISCARD
+from web3.types import TxReceipt
+
+from config import (
+    RPC,
+    ERC20_ABI,
+    FATAL_REVERTS,
+    FEE_BUMP_PERCENT,
+    L1_FEE_ORACLE_ABI,
+    L1_FEE_ORACLES,
+    SCROLL_TOKENS,
+    SCROLL_FEE_INACCURACY,
+    STUCK_TX_BLOCKS,
+)
 from settings import (
     GAS_MULTIPLIER,
+    MAX_FEE_BUMPS,
+    MAX_FEE_PER_GAS,
     MAX_ALL_AMOUNT_ETH_PERCENT,
-    MAX_PRIORITY_FEE,
     MIN_ALL_AMOUNT_ETH_PERCENT,
+    PIPELINE_DEPENDENT_TXS,
+    PREFLIGHT_SIMULATION,
 )
-from utils.helpers import retry
+from utils.account_state import TOKEN_METADATA, AccountState, get_account_state
+from utils.allowances import ALLOWANCES
+from utils.contracts import CONTRACTS, FunctionEncoder, checksum, get_web3
+from utils.fees import get_fee_strategy
+from utils.gas_usage import GAS_USAGE
+from utils.helpers import FatalTransactionError, retry
+from utils.signer import SIGNER
 from utils.sleeping import sleep
+from utils.watchers import get_arrival_watcher, get_balance_watcher
 
 
 class Account:
@@ -30,49 +56,89 @@ class Account:
         self.explorer = RPC[chain]["explorer"]
         self.token = RPC[chain]["token"]
 
-        self.w3 = AsyncWeb3(
-            AsyncWeb3.AsyncHTTPProvider(random.choice(RPC[chain]["rpc"])),
-            middlewares=[async_geth_poa_middleware],
-        )
+        self.w3 = get_web3(chain, random.choice(RPC[chain]["rpc"]))
 
-        self.account = EthereumAccount.from_key(private_key)
+        self.account = SIGNER.get_account(private_key)
         self.address = self.account.address
 
-    async def get_tx_data(self, value: int = 0, gas_price: bool = True):
+        # hash -> callback of transactions sent without waiting for the receipt
+        self.pending_txs = {}
+        self.next_nonce = 0
+        # hash -> {"transaction": signed fields, "sent_at": broadcast time or None},
+        # used to replace stuck transactions
+        self.sent_txs = {}
+        self.replaced_txs = {}
+        # contract address -> abi, used to decode reverts of preflight calls
+        self.abis = {}
+
+    async def get_tx_data(self, value: int = 0):
+        nonce = await self.w3.eth.get_transaction_count(self.address)
+
         tx = {
             "chainId": await self.w3.eth.chain_id,
             "from": self.address,
             "value": value,
-            "nonce": await self.w3.eth.get_transaction_count(self.address),
+            "nonce": max(nonce, self.next_nonce),
+            # the gas limit is decided in sign(), a value here only keeps
+            # build_transaction() from estimating it
+            "gas": 0,
         }
 
-        if gas_price:
-            tx.update({"gasPrice": await self.w3.eth.gas_price})
+        tx.update(await get_fee_strategy(self.chain).get_fees(self.w3))
 
         return tx
 
     def get_contract(
         self, contract_address: str, abi=None
     ) -> Union[Type[Contract], Contract]:
-        contract_address = self.w3.to_checksum_address(contract_address)
-
         if abi is None:
             abi = ERC20_ABI
 
-        contract = self.w3.eth.contract(address=contract_address, abi=abi)
+        contract = CONTRACTS.get_contract(self.w3, self.chain, contract_address, abi)
+        self.abis[contract.address] = abi
 
         return contract
 
+    def get_function(
+        self, contract_address: str, fn_name: str, abi=None
+    ) -> FunctionEncoder:
+        """Prebuilt encoder of one contract function, ERC20 by default"""
+        if abi is None:
+            abi = ERC20_ABI
+
+        function = CONTRACTS.get_function(
+            self.w3, self.chain, contract_address, abi, fn_name
+        )
+        self.abis[function.address] = abi
+
+        return function
+
+    def get_state(self) -> AccountState:
+        return get_account_state(self.chain, self.address)
+
+    async def get_cached_balance(self, contract_address: Optional[str] = None) -> dict:
+        """Same as get_balance, but served from the account state snapshot"""
+        state = self.get_state()
+
+        balance = state.get(contract_address)
+        if balance is None:
+            version = state.version
+            balance = await self.get_balance(contract_address)
+            # dropped if a transaction landed while the balance was read
+            state.set(contract_address, balance, version)
+
+        return balance
+
     @retry
     async def get_balances(self, tokens=SCROLL_TOKENS) -> dict:
         balances = {}
+        state = self.get_state()
 
         for symbol, contract in tokens.items():
-            await asyncio.sleep(0.3)
-            if symbol == "ETH":
-                balances[symbol] = await self.get_balance()
-            else:
-                balances[symbol] = await self.get_balance(contract)
+            contract_address = None if symbol == "ETH" else contract
+            if state.get(contract_address) is None:
+                await asyncio.sleep(0.3)
+            balances[symbol] = await self.get_cached_balance(contract_address)
 
         return balances
 
@@ -88,14 +154,18 @@ class Account:
                 "symbol": "ETH",
                 "decimal": 18,
             }
-        contract_address = AsyncWeb3.to_checksum_address(contract_address)
-        contract = self.get_contract(contract_address)
+        balance_of = self.get_function(contract_address, "balanceOf")
+
+        metadata_key = (self.chain, balance_of.address)
+        if metadata_key not in TOKEN_METADATA:
+            symbol = await self.get_function(contract_address, "symbol").call()
+            await asyncio.sleep(0.1)
+            decimal = await self.get_function(contract_address, "decimals").call()
+            await asyncio.sleep(0.1)
+            TOKEN_METADATA[metadata_key] = (symbol, decimal)
 
-        symbol = await contract.functions.symbol().call()
-        await asyncio.sleep(0.1)
-        decimal = await contract.functions.decimals().call()
-        await asyncio.sleep(0.1)
-        balance_wei = await contract.functions.balanceOf(self.address).call()
+        symbol, decimal = TOKEN_METADATA[metadata_key]
+        balance_wei = await balance_of.call(self.address)
 
         balance = balance_wei / 10**decimal
 
@@ -106,6 +176,76 @@ class Account:
             "decimal": decimal,
         }
 
+    async def get_gas_limit(
+        self, transaction: dict, estimate: Optional[int] = None
+    ) -> int:
+        """Observed gas usage of the call, estimate * GAS_MULTIPLIER for new calls"""
+        gas = GAS_USAGE.get_gas_limit(
+            self.chain, transaction.get("to"), transaction.get("data")
+        )
+        if gas is not None:
+            return gas
+
+        if estimate is None:
+            estimate = await self.w3.eth.estimate_gas(transaction)
+
+        return int(estimate * GAS_MULTIPLIER)
+
+    async def get_l1_fee(self, transaction: dict) -> int:
+        """L1 data fee of the transaction on rollups that charge one, else 0"""
+        if self.chain not in L1_FEE_ORACLES:
+            return 0
+
+        # the largest field values give an upper bound of the encoded size
+        template = {
+            "chainId": await self.w3.eth.chain_id,
+            "to": transaction.get("to"),
+            "data": transaction.get("data", "0x"),
+            "value": 2**80 - 1,
+            "nonce": 2**32 - 1,
+            "gas": 2**24 - 1,
+        }
+        if RPC[self.chain]["eip1559"]:
+            template.update(
+                {"maxFeePerGas": 2**48 - 1, "maxPriorityFeePerGas": 2**48 - 1}
+            )
+        else:
+            template.update({"gasPrice": 2**48 - 1})
+        signed_txn = await SIGNER.sign(self.address, template)
+
+        oracle = self.get_contract(L1_FEE_ORACLES[self.chain], L1_FEE_ORACLE_ABI)
+
+        return await oracle.functions.getL1Fee(signed_txn.rawTransaction).call()
+
+    async def get_max_sendable(self, transaction: dict, reserve_wei: int = 0) -> dict:
+        """
+        Returns the transaction with gas, fees and the largest value the wallet
+        can send with it while keeping reserve_wei. Sign what is returned, other
+        gas or fees make the value wrong. Nothing is left for a fee bump, so
+        replace_transaction can't replace such a transaction, the wait goes on
+        for the original.
+        """
+        transaction = {
+            key: value for key, value in transaction.items() if key != "gas"
+        }
+        transaction.setdefault("from", self.address)
+        transaction.setdefault("value", 0)
+
+        balance, fees, gas, l1_fee = await asyncio.gather(
+            self.get_cached_balance(),
+            get_fee_strategy(self.chain).get_fees(self.w3),
+            self.get_gas_limit(transaction),
+            self.get_l1_fee(transaction),
+        )
+
+        fee_per_gas = fees.get("maxFeePerGas", fees.get("gasPrice"))
+        value = balance["balance_wei"] - gas * fee_per_gas - l1_fee - reserve_wei
+
+        transaction.update(fees)
+        transaction.update({"gas": gas, "value": value})
+
+        return transaction
+
     @retry
     async def get_amount(
         self,
@@ -118,13 +258,32 @@ class Account:
         max_percent: int = MAX_ALL_AMOUNT_ETH_PERCENT,
         fee_cost_wei: float = 0,
         additinal_fees: Optional[list] = None,
+        transaction: Optional[dict] = None,
     ):
+        """
+        transaction - template of the transaction that sends the amount, with it
+        all_amount sends exactly what is left after its gas and fee_cost_wei, and
+        the template is filled with the gas and fees that amount is based on.
+
+        Without a template all_amount keeps fee_cost_wei or a percent of the
+        balance. Calls that carry the amount in their calldata and value (native
+        bridge, swaps) can't be estimated before the amount is known.
+        """
         random_amount = round(random.uniform(min_amount, max_amount), decimal)
 
         if from_token == "ETH":
-            balance = await self.w3.eth.get_balance(self.address)
-
-            if fee_cost_wei:
+            balance = (await self.get_cached_balance())["balance_wei"]
+
+            if fee_cost_wei and transaction is not None and all_amount:
+                add_fee = sum(additinal_fees) if additinal_fees is not None else 0
+                transaction.update(
+                    await self.get_max_sendable(
+                        transaction,
+                        reserve_wei=fee_cost_wei + Web3.to_wei(add_fee, "ether"),
+                    )
+                )
+                value = transaction["value"]
+            elif fee_cost_wei:
                 add_fee = 0
                 if additinal_fees is not None:
                     for fee in additinal_fees:
@@ -155,7 +314,7 @@ class Account:
             )
             amount = Web3.from_wei(int(value), "ether") if all_amount else random_amount
         else:
-            balance = await self.get_balance(SCROLL_TOKENS[from_token])
+            balance = await self.get_cached_balance(SCROLL_TOKENS[from_token])
             amount_wei = (
                 balance["balance_wei"]
                 if all_amount
@@ -168,24 +327,38 @@ class Account:
 
     @retry
     async def check_allowance(self, token_address: str, contract_address: str) -> int:
-        token_address = self.w3.to_checksum_address(token_address)
-        contract_address = self.w3.to_checksum_address(contract_address)
+        token_address = checksum(token_address)
+        contract_address = checksum(contract_address)
+
+        amount_approved = ALLOWANCES.get(
+            self.chain, self.address, token_address, contract_address
+        )
+        if amount_approved is not None:
+            return amount_approved
 
-        contract = self.w3.eth.contract(address=token_address, abi=ERC20_ABI)
-        amount_approved = await contract.functions.allowance(
+        amount_approved = await self.get_function(token_address, "allowance").call(
             self.address, contract_address
-        ).call()
+        )
+
+        ALLOWANCES.set(
+            self.chain, self.address, token_address, contract_address, amount_approved
+        )
 
         return amount_approved
 
+    def spend_allowance(
+        self, amount: int, token_address: str, contract_address: str
+    ) -> None:
+        ALLOWANCES.spend(
+            self.chain, self.address, token_address, contract_address, amount
+        )
+
     @retry
     async def approve(
         self, amount: float, token_address: str, contract_address: str
     ) -> None:
-        token_address = self.w3.to_checksum_address(token_address)
-        contract_address = self.w3.to_checksum_address(contract_address)
-
-        contract = self.w3.eth.contract(address=token_address, abi=ERC20_ABI)
+        token_address = checksum(token_address)
+        contract_address = checksum(contract_address)
 
         allowance_amount = await self.check_allowance(token_address, contract_address)
 
@@ -196,16 +369,32 @@ class Account:
 
             tx_data = await self.get_tx_data()
 
-            transaction = await contract.functions.approve(
-                contract_address, approve_amount
-            ).build_transaction(tx_data)
+            transaction = self.get_function(
+                token_address, "approve"
+            ).build_transaction(tx_data, contract_address, approve_amount)
 
             signed_txn = await self.sign(transaction)
 
             txn_hash = await self.send_raw_transaction(signed_txn)
 
+            set_allowance = partial(
+                ALLOWANCES.set,
+                self.chain,
+                self.address,
+                token_address,
+                contract_address,
+                approve_amount,
+            )
+
+            if PIPELINE_DEPENDENT_TXS:
+                self.pending_txs[txn_hash.hex()] = set_allowance
+                self.next_nonce = transaction["nonce"] + 1
+                return
+
             await self.wait_until_tx_finished(txn_hash.hex())
 
+            set_allowance()
+
             await sleep(
                 account_id=self.account_id,
                 address=self.address,
@@ -221,51 +410,115 @@ class Account:
         chain="scroll",
         timeout=24 * 60 * 60 + 30,
         fee_inaccuracy=0.0015,
-        sleep=60,
+        match_transfers=False,
+        senders=None,
+        arrival=None,
     ):
+        """
+        match_transfers - watch destination blocks for a direct transfer of the
+        amount to this wallet, from one of senders if they are known
+        arrival - future resolved once the bridge paid out, e.g. from LogWatcher
+
+        Only without either of them the wait is for the balance to reach
+        balance_wei + increase_amount_wei
+        """
         logger.info(
             f"[{self.account_id}][{self.address}] Waiting for balance increase from {balance_wei / 10 ** 18} to {(balance_wei + increase_amount_wei) / 10 ** 18} on {chain} for {timeout} seconds"
         )
-        start_time = time.time()
 
-        account = self
-        if chain != self.chain:
-            account = Account(
-                account_id=self.account_id,
-                private_key=self.private_key,
-                chain=chain,
+        fee_inaccuracy_wei = AsyncWeb3.to_wei(fee_inaccuracy, "ether")
+
+        if arrival is not None:
+            waiter = arrival
+        elif match_transfers:
+            waiter = get_arrival_watcher(chain).watch(
+                self.address, increase_amount_wei - fee_inaccuracy_wei, senders
+            )
+        else:
+            waiter = get_balance_watcher(chain).watch(
+                self.address, balance_wei + increase_amount_wei - fee_inaccuracy_wei
             )
 
-        while True:
-            if time.time() - start_time > timeout:
-                logger.error(
-                    f"[{self.account_id}][{self.address}] Timeout {timeout} seconds reached"
-                )
-                return False
+        done, pending = await asyncio.wait([waiter], timeout=timeout)
+        for waiter in pending:
+            waiter.cancel()
 
-            new_balance = (await account.get_balance())["balance_wei"]
-            if new_balance >= balance_wei + increase_amount_wei - AsyncWeb3.to_wei(
-                fee_inaccuracy, "ether"
-            ):
-                logger.success(
-                    f"[{self.account_id}][{self.address}] Balance increased from {balance_wei / 10 ** 18} to {new_balance / 10 ** 18}"
-                )
-                return True
+        if not done:
+            logger.error(
+                f"[{self.account_id}][{self.address}] Timeout {timeout} seconds reached"
+            )
+            return False
 
-            await asyncio.sleep(sleep)
+        logger.success(
+            f"[{self.account_id}][{self.address}] Funds from the bridge arrived on {chain}"
+        )
+        get_account_state(chain, self.address).invalidate()
+        return True
+
+    async def wait_for_pending_txs(self) -> None:
+        """Waits for the transactions sent ahead of the ones depending on them"""
+        pending_txs, self.pending_txs = self.pending_txs, {}
+
+        for hash, callback in pending_txs.items():
+            if await self.wait_until_tx_finished(hash) is not None:
+                callback()
+
+    async def reset_nonce(self) -> None:
+        """
+        Drops the local nonce of a send that didn't reach the chain, so the
+        next transaction doesn't leave a gap
+        """
+        try:
+            self.next_nonce = await self.w3.eth.get_transaction_count(
+                self.address, "pending"
+            )
+        except Exception as e:
+            logger.error(
+                f"[{self.account_id}][{self.address}] Failed to reset the nonce | {e}"
+            )
 
     @retry
-    async def wait_until_tx_finished(self, hash: str, max_wait_time=1000) -> None:
+    async def wait_until_tx_finished(self, hash: str, max_wait_time=1000) -> TxReceipt:
+        try:
+            return await self.wait_for_receipt(hash, max_wait_time)
+        except Exception as e:
+            await self.reset_nonce()
+            raise e
+
+    async def wait_for_receipt(self, hash: str, max_wait_time: int) -> TxReceipt:
+        if self.pending_txs:
+            await self.wait_for_pending_txs()
+
+        # the original and its replacements, whichever is mined first counts
+        hashes = [hash]
+
         start_time = time.time()
+        # set when a replacement couldn't be sent, the next try waits a full window
+        retry_at = 0
         while True:
             try:
-                receipts = await self.w3.eth.get_transaction_receipt(hash)
+                receipts = await self.get_first_receipt(hashes)
+                hash = receipts["transactionHash"].hex()
                 status = receipts.get("status")
+                if status is not None:
+                    self.get_state().invalidate()
+
                 if status == 1:
+                    sent_tx = self.sent_txs.get(hash)
+                    if sent_tx is not None:
+                        GAS_USAGE.record(
+                            self.chain,
+                            sent_tx["transaction"].get("to"),
+                            sent_tx["transaction"].get("data"),
+                            receipts["gasUsed"],
+                        )
+
+                    fee = receipts["gasUsed"] * receipts.get("effectiveGasPrice", 0)
                     logger.success(
-                        f"[{self.account_id}][{self.address}] {self.explorer}{hash} successfully!"
+                        f"[{self.account_id}][{self.address}] {self.explorer}{hash} successfully! "
+                        + f"| gas used {receipts['gasUsed']} | fee {self.w3.from_wei(fee, 'ether')} {self.token}"
                     )
-                    return
+                    return receipts
                 elif status is None:
                     await asyncio.sleep(0.3)
                 else:
@@ -279,8 +532,171 @@ class Account:
                         f"[{self.account_id}][{self.address}] {self.explorer}{hash} transaction not found!"
                     )
                     raise Exception(f"Transaction not found! {self.explorer}{hash}")
+
+                if len(hashes) <= MAX_FEE_BUMPS and time.time() > retry_at:
+                    deadline = await self.get_stuck_deadline(hashes[-1], start_time)
+                    if time.time() > deadline:
+                        replacement = await self.replace_transaction(hashes[-1])
+                        if replacement is not None:
+                            hashes.append(replacement)
+                        else:
+                            retry_at = (
+                                time.time()
+                                + RPC[self.chain]["block_time"] * STUCK_TX_BLOCKS
+                            )
+
                 await asyncio.sleep(1)
 
+    async def get_stuck_deadline(self, hash: str, start_time: float) -> float:
+        """
+        Time the transaction counts as stuck. One paying the current fees gets
+        STUCK_TX_BLOCKS blocks, an underpriced one a share of them as small as
+        the share of the current tip or max fee it pays.
+        """
+        sent_tx = self.sent_txs.get(hash)
+        if sent_tx is None:
+            return start_time + RPC[self.chain]["block_time"] * STUCK_TX_BLOCKS
+
+        transaction = sent_tx["transaction"]
+        fees = await get_fee_strategy(self.chain).get_fees(self.w3)
+
+        ratio = min(
+            [transaction.get(field, 0) / fee for field, fee in fees.items() if fee]
+            + [1]
+        )
+        blocks = max(1, int(STUCK_TX_BLOCKS * ratio))
+
+        sent_at = sent_tx["sent_at"] or start_time
+
+        return sent_at + RPC[self.chain]["block_time"] * blocks
+
+    async def get_first_receipt(self, hashes: list) -> TxReceipt:
+        for hash in hashes:
+            try:
+                return await self.w3.eth.get_transaction_receipt(hash)
+            except TransactionNotFound:
+                continue
+
+        raise TransactionNotFound(f"None of {hashes} is mined")
+
+    async def replace_transaction(self, hash: str) -> Optional[str]:
+        """
+        Resends a stuck transaction with the same nonce and bumped fees, None if
+        it couldn't be sent or its fees already reached MAX_FEE_PER_GAS
+        """
+        sent_tx = self.sent_txs.get(hash)
+        if sent_tx is None:
+            return None
+
+        transaction = dict(sent_tx["transaction"])
+        for field in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"):
+            if field in transaction:
+                # +1 wei, a zero tip stays zero after the percent bump
+                bumped = transaction[field] * (100 + FEE_BUMP_PERCENT) // 100
+                transaction[field] = max(bumped, transaction[field] + 1)
+
+        # a base fee spike is the usual reason to be stuck, catch up with it
+        if "gasPrice" in transaction:
+            transaction["gasPrice"] = max(
+                transaction["gasPrice"], await self.w3.eth.gas_price
+            )
+        else:
+            fees = await get_fee_strategy(self.chain).load_fees(self.w3)
+            transaction["maxPriorityFeePerGas"] = max(
+                transaction["maxPriorityFeePerGas"], fees["maxPriorityFeePerGas"]
+            )
+            # 2 * next base fee + the tip
+            transaction["maxFeePerGas"] = max(
+                transaction["maxFeePerGas"],
+                fees["maxFeePerGas"]
+                - fees["maxPriorityFeePerGas"]
+                + transaction["maxPriorityFeePerGas"],
+            )
+
+        if self.chain in MAX_FEE_PER_GAS:
+            max_fee = self.w3.to_wei(MAX_FEE_PER_GAS[self.chain], "gwei")
+            for field in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"):
+                if field in transaction:
+                    transaction[field] = min(transaction[field], max_fee)
+
+            if all(
+                transaction[field] <= sent_tx["transaction"][field]
+                for field in ("gasPrice", "maxFeePerGas")
+                if field in transaction
+            ):
+                logger.warning(
+                    f"[{self.account_id}][{self.address}] {self.explorer}{hash} is stuck, but its fees reached MAX_FEE_PER_GAS"
+                )
+                return None
+
+        try:
+            signed_txn = await SIGNER.sign(self.address, transaction)
+            replacement = (await self.send_raw_transaction(signed_txn)).hex()
+        except Exception as e:
+            logger.error(
+                f"[{self.account_id}][{self.address}] Failed to replace stuck transaction {hash} | {e}"
+            )
+            return None
+
+        self.sent_txs[replacement] = {
+            "transaction": transaction,
+            "sent_at": time.time(),
+        }
+        self.replaced_txs[hash] = replacement
+
+        logger.warning(
+            f"[{self.account_id}][{self.address}] {self.explorer}{hash} is stuck, replaced with {self.explorer}{replacement}"
+        )
+
+        return replacement
+
+    @staticmethod
+    def decode_events(receipt: TxReceipt, contract: Contract, event_name: str) -> list:
+        """Events of the contract ABI emitted in the receipt, other logs are skipped"""
+        event = contract.events[event_name]()
+
+        return [
+            log
+            for log in event.process_receipt(receipt, errors=DISCARD)
+            if log["address"] == contract.address
+        ]
+
+    def decode_revert(self, to: Optional[str], error: ContractLogicError) -> str:
+        """Names a custom error with the ABI of the called contract"""
+        if not isinstance(error, ContractCustomError) or to not in self.abis:
+            return error.message
+
+        data = error.data if isinstance(error.data, str) else error.message
+        for item in self.abis[to]:
+            if item.get("type") != "error":
+                continue
+
+            selector = "0x" + function_abi_to_4byte_selector(item).hex()
+            if data.startswith(selector):
+                types = [arg["type"] for arg in item["inputs"]]
+                args = self.w3.codec.decode(types, bytes.fromhex(data[10:]))
+                return f"{item['name']}{tuple(args)}"
+
+        return error.message
+
+    async def preflight(self, transaction: dict) -> None:
+        """Runs the transaction as eth_call on the pending block before signing"""
+        call = {key: value for key, value in transaction.items() if key != "gas"}
+
+        try:
+            await self.w3.eth.call(call, "pending")
+        except ContractLogicError as e:
+            reason = self.decode_revert(transaction.get("to"), e)
+            if any(marker in reason.lower() for marker in FATAL_REVERTS):
+                raise FatalTransactionError(
+                    f"Transaction simulation reverted | {reason}"
+                )
+            raise Exception(f"Transaction simulation reverted | {reason}")
+        except ValueError as e:
+            if "insufficient funds" in str(e):
+                raise FatalTransactionError(f"Transaction simulation failed | {e}")
+            raise e
+
     @retry
     async def sign(self, transaction, wait_for_gas=True) -> Any:
         from utils.gas_checker import wait_gas
@@ -288,30 +704,55 @@ class Account:
         if wait_for_gas:
             await wait_gas()
 
-        if transaction.get("gasPrice", None) is None:
-            max_priority_fee_per_gas = self.w3.to_wei(
-                MAX_PRIORITY_FEE["ethereum"], "gwei"
-            )
-            max_fee_per_gas = await self.w3.eth.gas_price
+        if "gasPrice" not in transaction and "maxFeePerGas" not in transaction:
+            transaction.update(await get_fee_strategy(self.chain).get_fees(self.w3))
 
-            transaction.update(
-                {
-                    "maxPriorityFeePerGas": max_priority_fee_per_gas,
-                    "maxFeePerGas": max_fee_per_gas,
-                }
-            )
+        # 0 is the placeholder of get_tx_data, a real limit comes from get_max_sendable.
+        # It stays in the caller's transaction, a retry must sign with the same limit
+        gas = transaction.get("gas", 0)
+        call = {key: value for key, value in transaction.items() if key != "gas"}
+
+        if PREFLIGHT_SIMULATION and not self.pending_txs:
+            # with pending transactions the estimate against the pending block
+            # below is the simulation, the node may not see them for eth_call
+            await self.preflight(call)
 
-        gas = await self.w3.eth.estimate_gas(transaction)
-        gas = int(gas * GAS_MULTIPLIER)
+        if self.pending_txs:
+            try:
+                estimate = await self.w3.eth.estimate_gas(call, "pending")
+            except Exception as e:
+                logger.info(
+                    f"[{self.account_id}][{self.address}] Simulation against the pending block failed, waiting for pending transactions | {e}"
+                )
+                await self.wait_for_pending_txs()
+                estimate = await self.w3.eth.estimate_gas(call)
+
+            gas = gas or await self.get_gas_limit(call, estimate)
+        elif not gas:
+            gas = await self.get_gas_limit(call)
 
         transaction.update({"gas": gas})
 
-        signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
+        signed_txn = await SIGNER.sign(self.address, transaction)
+        self.sent_txs[signed_txn.hash.hex()] = {
+            "transaction": dict(transaction),
+            "sent_at": None,
+        }
 
         return signed_txn
 
     @retry
     async def send_raw_transaction(self, signed_txn) -> HexBytes:
-        txn_hash = await self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        try:
+            txn_hash = await self.w3.eth.send_raw_transaction(
+                signed_txn.rawTransaction
+            )
+        except Exception as e:
+            await self.reset_nonce()
+            raise e
+
+        sent_tx = self.sent_txs.get(txn_hash.hex())
+        if sent_tx is not None:
+            sent_tx["sent_at"] = time.time()
 
         return txn_hash
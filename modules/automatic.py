@@ -1,7 +1,8 @@
-import enum
+import asyncio
 import random
 from copy import deepcopy
 import traceback
+from typing import Optional
 
 from loguru import logger
 from web3 import Web3
@@ -15,30 +16,20 @@ from settings import (
     SLEEP_MAX,
     SLEEP_MIN,
 )
+from utils.fleet import FLEET, RouteStage
+from utils.helpers import FatalTransactionError
 from utils.sleeping import sleep
 
 
-class AutomaticModules(str, enum.Enum):
-    swaps = "swaps"
-    wrap_unwrap_eth = "wrap_unwrap_eth"
-    send_email = "send_email"
-    mint_l2pass = "mint_l2pass"
-    mint_bridge_l2_telegraph = "mint_l2_telegraph"
-    l2telegraph_send_message = "l2telegraph_send_message"
-    create_gnosis_safe = "create_gnosis_safe"
-    create_omnisea_collection = "create_omnisea_collection"
-    aave = "aave"
-    layerbank = "layerbank"
-    mint_nfts2me = "mint_nfts2me"
-    mint_zerius = "mint_zerius"
-    mint_zkstars = "mint_zkstars"
-    rubyscore_vote = "rubyscore_vote"
-    deploy_contract = "deploy_contract"
-    bridge_in = "bridge_in"
-    bridge_out = "bridge_out"
-
-
 class Automatic(Account):
+    # bridge in service -> its module config
+    BRIDGE_IN_CONFIGS = {
+        "native": MODULES_NAMES.bridge_in_scroll,
+        "orbiter": MODULES_NAMES.bridge_orbiter,
+        "layerswap": MODULES_NAMES.bridge_layerswap,
+        "nitro": MODULES_NAMES.bridge_nitro,
+    }
+
     class ModuleEntry:
         def __init__(self, module, config):
             self.module_name = module
@@ -67,6 +58,7 @@ class Automatic(Account):
         self.modules_config = deepcopy(modules_config)
 
         self.modules_entries = []
+        self.idle_tasks = []
 
         self.bridge_in = None
         self.brdge_out = None
@@ -96,20 +88,25 @@ class Automatic(Account):
     async def run(self):
         if self.config["okx_withdraw_enabled"]:
             await self.okx_withdraw()
+            FLEET.set_progress(self.address, RouteStage.okx_withdrawn)
 
         if self.config[AutomaticModules.bridge_in]["bridge_in_enabled"]:
             await self.bridge_in()
+            FLEET.set_progress(self.address, RouteStage.bridged_in)
 
         await self.run_modules()
 
         if self.config["swap_all_tokens_to_eth_before_withdraw"]:
             await self.swap_all_tokens_to_eth()
+        FLEET.set_progress(self.address, RouteStage.modules_done)
 
         if self.config[AutomaticModules.bridge_out]["bridge_out_enabled"]:
             await self.bridge_out()
+            FLEET.set_progress(self.address, RouteStage.bridged_out)
 
         if self.config["okx_deposit_enabled"]:
             await self.okx_deposit()
+            FLEET.set_progress(self.address, RouteStage.okx_deposited)
 
     async def run_modules(self):
         while len(self.modules_entries) > 0:
@@ -134,6 +131,11 @@ class Automatic(Account):
         while not done and retries <= max_retries:
             try:
                 done = await func(**func_kwargs)
+            except FatalTransactionError as e:
+                logger.error(
+                    f"[{self.account_id}][{self.address}] | {module_name} can't succeed, skipping retries | {e}"
+                )
+                break
             except Exception as e:
                 if ENABLE_ERROR_TRACEBACK:
                     logger.error(
@@ -183,11 +185,14 @@ class Automatic(Account):
         max_retries = max_retries if max_retries is not None else RETRIES
 
         if self.made_first_transaction or self.config["sleep_at_start"]:
-            await sleep(
-                account_id=self.account_id,
-                address=self.address,
-                sleep_from=SLEEP_MIN,
-                sleep_to=SLEEP_MAX,
+            await asyncio.gather(
+                sleep(
+                    account_id=self.account_id,
+                    address=self.address,
+                    sleep_from=SLEEP_MIN,
+                    sleep_to=SLEEP_MAX,
+                ),
+                self.run_idle_tasks(),
             )
 
         if module_class is not None:
@@ -214,6 +219,39 @@ class Automatic(Account):
 
         return done or self.config["skip_if_failed"]
 
+    async def run_idle_tasks(self):
+        """Runs queued background work while the account sleeps between modules"""
+        while self.idle_tasks:
+            task = self.idle_tasks.pop(0)
+            try:
+                await task()
+            except Exception as e:
+                logger.error(
+                    f"[{self.account_id}][{self.address}] | Idle task failed, it will be done on demand | {e}"
+                )
+
+    async def approve_swap_routers(self):
+        """Approves the token the next swap sells for the router it will use"""
+        config = self.config[AutomaticModules.swaps]
+
+        balances = await self.get_balances(config)
+        src_token = self.choose_src_token(balances=balances, config=config)
+        if src_token["symbol"] == "ETH" or not src_token["balance_wei"]:
+            return
+
+        # tokens are only swapped to ETH, so the router can be chosen now
+        swap_module = self.choose_swap_module(
+            config=config, src_token=src_token, dst_token=balances["ETH"]
+        )
+        config["next_swap_module"] = swap_module["name"]
+
+        # approve() only sends a transaction when nothing is approved yet
+        await self.approve(
+            1, SCROLL_TOKENS[src_token["symbol"]], swap_module["spender"]
+        )
+
+        await self.wait_for_pending_txs()
+
     async def swap_all_tokens_to_eth(self):
         config = self.config[AutomaticModules.swaps]
 
@@ -663,6 +701,9 @@ class Automatic(Account):
                 performed_quantity += 1
                 config["performed_quantity"] += 1
 
+            if config["preapprove_routers"]:
+                self.idle_tasks.append(self.approve_swap_routers)
+
         return performed_quantity
 
     async def swap(self, config):
@@ -673,7 +714,10 @@ class Automatic(Account):
             src_token=src_token, balances=balances, config=config
         )
         swap_module = self.choose_swap_module(
-            config=config, src_token=src_token, dst_token=dst_token
+            config=config,
+            src_token=src_token,
+            dst_token=dst_token,
+            preferred=config.pop("next_swap_module", None),
         )
         amount = self.get_amount(
             config=config,
@@ -715,7 +759,8 @@ class Automatic(Account):
 
         return "all"
 
-    def choose_swap_module(self, config, src_token, dst_token):
+    def choose_swap_module(self, config, src_token, dst_token, preferred=None):
+        """preferred - module to use if it can make the swap, its router is approved"""
         modules = []
         for module_name in config["services"]:
             module = SWAP_MODULES[module_name]
@@ -727,6 +772,10 @@ class Automatic(Account):
                 module["name"] = module_name
                 modules.append(module)
 
+        for module in modules:
+            if module["name"] == preferred:
+                return module
+
         return random.choice(modules)
 
     def choose_number_of_swaps(self, config):
@@ -832,12 +881,15 @@ class Automatic(Account):
             chain=self.config[AutomaticModules.bridge_in]["bridge_in_chain"],
             credentials=config["credentials"],
         )
+        # planned for the whole fleet before the run, if it was
+        amount = FLEET.get_plan("okx_withdraw", self.address)
+
         if not (
             await self.execute_func_with_retries(
                 func=okx_client.withdraw,
                 func_kwargs={
-                    "min_amount": config["min_amount"],
-                    "max_amount": config["max_amount"],
+                    "min_amount": config["min_amount"] if amount is None else amount,
+                    "max_amount": config["max_amount"] if amount is None else amount,
                     "token": config["token"],
                     "transfer_from_subaccounts": config["transfer_from_subaccounts"],
                 },
@@ -848,7 +900,7 @@ class Automatic(Account):
 
         return True
 
-    async def layerswap_bridge_in(self):
+    async def layerswap_bridge_in(self, amount_kwargs: Optional[dict] = None):
         config = self.modules_config[MODULES_NAMES.bridge_layerswap]
 
         layerswap = LayerSwap(
@@ -860,12 +912,7 @@ class Automatic(Account):
             func=layerswap.bridge,
             func_kwargs={
                 "to_chain": config["to_chain"],
-                "min_amount": config["min_amount"],
-                "max_amount": config["max_amount"],
-                "decimal": config["decimal"],
-                "all_amount": config["all_amount"],
-                "min_percent": config["min_percent"],
-                "max_percent": config["max_percent"],
+                **(amount_kwargs or self.get_amount_kwargs(config)),
             },
             module_name="LayerSwap bridge in",
         ):
@@ -873,14 +920,15 @@ class Automatic(Account):
 
         return True
 
-    async def layerswap_bridge_out(self):
-        try:
-            amount = await self.get_amount_to_bridge_out()
-        except ValueError as e:
-            logger.info(
-                f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
-            )
-            return True
+    async def layerswap_bridge_out(self, amount: Optional[float] = None):
+        if amount is None:
+            try:
+                amount = await self.get_amount_to_bridge_out()
+            except ValueError as e:
+                logger.info(
+                    f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
+                )
+                return True
 
         layerswap = LayerSwap(self.account_id, self.private_key, chain="scroll")
         if not await self.execute_func_with_retries(
@@ -902,7 +950,7 @@ class Automatic(Account):
 
         return True
 
-    async def orbiter_bridge_in(self):
+    async def orbiter_bridge_in(self, amount_kwargs: Optional[dict] = None):
         config = self.modules_config[MODULES_NAMES.bridge_orbiter]
 
         orbiter = Orbiter(
@@ -914,12 +962,7 @@ class Automatic(Account):
             func=orbiter.bridge,
             func_kwargs={
                 "to_chain": "scroll",
-                "min_amount": config["min_amount"],
-                "max_amount": config["max_amount"],
-                "decimal": config["decimal"],
-                "all_amount": config["all_amount"],
-                "min_percent": config["min_percent"],
-                "max_percent": config["max_percent"],
+                **(amount_kwargs or self.get_amount_kwargs(config)),
             },
             module_name="Orbiter bridge in",
         ):
@@ -927,14 +970,15 @@ class Automatic(Account):
 
         return True
 
-    async def orbiter_bridge_out(self):
-        try:
-            amount = await self.get_amount_to_bridge_out()
-        except ValueError as e:
-            logger.info(
-                f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
-            )
-            return True
+    async def orbiter_bridge_out(self, amount: Optional[float] = None):
+        if amount is None:
+            try:
+                amount = await self.get_amount_to_bridge_out()
+            except ValueError as e:
+                logger.info(
+                    f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
+                )
+                return True
 
         orbiter = Orbiter(self.account_id, self.private_key, chain="scroll")
         if not await self.execute_func_with_retries(
@@ -956,7 +1000,7 @@ class Automatic(Account):
 
         return True
 
-    async def nitro_bridge_in(self):
+    async def nitro_bridge_in(self, amount_kwargs: Optional[dict] = None):
         config = self.modules_config[MODULES_NAMES.bridge_nitro]
 
         nitro = Nitro(
@@ -968,12 +1012,7 @@ class Automatic(Account):
             func=nitro.bridge,
             func_kwargs={
                 "to_chain": "scroll",
-                "min_amount": config["min_amount"],
-                "max_amount": config["max_amount"],
-                "decimal": config["decimal"],
-                "all_amount": config["all_amount"],
-                "min_percent": config["min_percent"],
-                "max_percent": config["max_percent"],
+                **(amount_kwargs or self.get_amount_kwargs(config)),
             },
             module_name="Nitro bridge in",
         ):
@@ -981,14 +1020,15 @@ class Automatic(Account):
 
         return True
 
-    async def nitro_bridge_out(self):
-        try:
-            amount = await self.get_amount_to_bridge_out()
-        except ValueError as e:
-            logger.info(
-                f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
-            )
-            return True
+    async def nitro_bridge_out(self, amount: Optional[float] = None):
+        if amount is None:
+            try:
+                amount = await self.get_amount_to_bridge_out()
+            except ValueError as e:
+                logger.info(
+                    f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
+                )
+                return True
 
         nitro = Nitro(self.account_id, self.private_key, chain="scroll")
         if not await self.execute_func_with_retries(
@@ -1010,19 +1050,14 @@ class Automatic(Account):
 
         return True
 
-    async def native_bridge_in(self):
+    async def native_bridge_in(self, amount_kwargs: Optional[dict] = None):
         config = self.modules_config[MODULES_NAMES.bridge_in_scroll]
 
         scroll = Scroll(self.account_id, self.private_key, "ethereum")
         if not await self.execute_func_with_retries(
             func=scroll.deposit,
             func_kwargs={
-                "min_amount": config["min_amount"],
-                "max_amount": config["max_amount"],
-                "decimal": config["decimal"],
-                "all_amount": config["all_amount"],
-                "min_percent": config["min_percent"],
-                "max_percent": config["max_percent"],
+                **(amount_kwargs or self.get_amount_kwargs(config)),
             },
             module_name="Native bridge in",
         ):
@@ -1030,14 +1065,15 @@ class Automatic(Account):
 
         return True
 
-    async def native_bridge_out(self):
-        try:
-            amount = await self.get_amount_to_bridge_out()
-        except ValueError as e:
-            logger.info(
-                f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
-            )
-            return True
+    async def native_bridge_out(self, amount: Optional[float] = None):
+        if amount is None:
+            try:
+                amount = await self.get_amount_to_bridge_out()
+            except ValueError as e:
+                logger.info(
+                    f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
+                )
+                return True
 
         config = self.modules_config[MODULES_NAMES.bridge_out_scroll]
 
@@ -1058,8 +1094,83 @@ class Automatic(Account):
 
         return True
 
+    @staticmethod
+    def get_amount_kwargs(config: dict) -> dict:
+        return {
+            key: config[key]
+            for key in (
+                "min_amount",
+                "max_amount",
+                "decimal",
+                "all_amount",
+                "min_percent",
+                "max_percent",
+            )
+        }
+
+    def draw_bridge_in_amount(self, service: str, balance_wei: int) -> tuple:
+        """
+        Amount kwargs of the service's bridge with the random amount drawn once,
+        so the quote is for what is sent, and that amount in wei
+        """
+        config = self.modules_config[self.BRIDGE_IN_CONFIGS[service]]
+        amount_kwargs = self.get_amount_kwargs(config)
+
+        if config["all_amount"]:
+            return amount_kwargs, int(balance_wei * config["max_percent"] / 100)
+
+        amount = round(
+            random.uniform(config["min_amount"], config["max_amount"]),
+            config["decimal"],
+        )
+        amount_kwargs.update({"min_amount": amount, "max_amount": amount})
+
+        return amount_kwargs, Web3.to_wei(amount, "ether")
+
+    async def auto_bridge_in(self):
+        config = self.config[AutomaticModules.bridge_in]
+
+        selector = BridgeSelector(
+            self.account_id, self.private_key, chain=config["bridge_in_chain"]
+        )
+        balance_wei = (await selector.get_cached_balance())["balance_wei"]
+
+        amounts = {
+            service: self.draw_bridge_in_amount(service, balance_wei)
+            for service in config["bridge_in_auto_services"]
+        }
+        service = await selector.choose(
+            "scroll",
+            {service: amount_wei for service, (_, amount_wei) in amounts.items()},
+        )
+
+        return await self.bridges_in[service](amounts[service][0])
+
+    async def auto_bridge_out(self):
+        config = self.config[AutomaticModules.bridge_out]
+
+        try:
+            amount = await self.get_amount_to_bridge_out()
+        except ValueError as e:
+            logger.info(
+                f"[{self.account_id}][{self.address}] | Balance is too low to bridge out, skipping"
+            )
+            return True
+
+        selector = BridgeSelector(self.account_id, self.private_key, chain="scroll")
+        service = await selector.choose(
+            config["bridge_out_chain"],
+            {
+                service: Web3.to_wei(amount, "ether")
+                for service in config["bridge_out_auto_services"]
+            },
+        )
+
+        # the amount quoted is the amount sent, no new leave amount is drawn
+        return await self.bridges_out[service](amount)
+
     async def get_amount_to_bridge_out(self):
-        balance_wei = await self.w3.eth.get_balance(self.address)
+        balance_wei = (await self.get_cached_balance())["balance_wei"]
         balance = float(Web3.from_wei(balance_wei, "ether"))
 
         amount_to_leave = round(
@@ -1096,37 +1207,32 @@ class Automatic(Account):
         ]
 
     def _configure(self, modules):
-        if self.config[AutomaticModules.bridge_in]["bridge_in_service"] == "native":
-            self.bridge_in = self.native_bridge_in
-        elif self.config[AutomaticModules.bridge_in]["bridge_in_service"] == "orbiter":
-            self.bridge_in = self.orbiter_bridge_in
-        elif (
-            self.config[AutomaticModules.bridge_in]["bridge_in_service"] == "layerswap"
-        ):
-            self.bridge_in = self.layerswap_bridge_in
-        elif self.config[AutomaticModules.bridge_in]["bridge_in_service"] == "nitro":
-            self.bridge_in = self.nitro_bridge_in
-        else:
-            raise ValueError(
-                f"Unknown bridge_in_service: {self.config[AutomaticModules.bridge_in]['bridge_in_service']}"
-            )
-        if self.config[AutomaticModules.bridge_out]["bridge_out_service"] == "native":
-            self.bridge_out = self.native_bridge_out
-        elif (
-            self.config[AutomaticModules.bridge_out]["bridge_out_service"] == "orbiter"
-        ):
-            self.bridge_out = self.orbiter_bridge_out
-        elif (
-            self.config[AutomaticModules.bridge_out]["bridge_out_service"]
-            == "layerswap"
-        ):
-            self.bridge_out = self.layerswap_bridge_out
-        elif self.config[AutomaticModules.bridge_out]["bridge_out_service"] == "nitro":
-            self.bridge_out = self.nitro_bridge_out
-        else:
-            raise ValueError(
-                f"Unknown bridge_out_service: {self.config[AutomaticModules.bridge_out]['bridge_out_service']}"
-            )
+        self.bridges_in = {
+            "native": self.native_bridge_in,
+            "orbiter": self.orbiter_bridge_in,
+            "layerswap": self.layerswap_bridge_in,
+            "nitro": self.nitro_bridge_in,
+            "auto": self.auto_bridge_in,
+        }
+        self.bridges_out = {
+            "native": self.native_bridge_out,
+            "orbiter": self.orbiter_bridge_out,
+            "layerswap": self.layerswap_bridge_out,
+            "nitro": self.nitro_bridge_out,
+            "auto": self.auto_bridge_out,
+        }
+
+        bridge_in_service = self.config[AutomaticModules.bridge_in]["bridge_in_service"]
+        if bridge_in_service not in self.bridges_in:
+            raise ValueError(f"Unknown bridge_in_service: {bridge_in_service}")
+        self.bridge_in = self.bridges_in[bridge_in_service]
+
+        bridge_out_service = self.config[AutomaticModules.bridge_out][
+            "bridge_out_service"
+        ]
+        if bridge_out_service not in self.bridges_out:
+            raise ValueError(f"Unknown bridge_out_service: {bridge_out_service}")
+        self.bridge_out = self.bridges_out[bridge_out_service]
 
         for module_name in modules:
             quantity = random.randint(
@@ -1149,3 +1255,9 @@ class Automatic(Account):
 
             for _ in range(quantity):
                 self.modules_entries.append(entry)
+
+        if (
+            AutomaticModules.swaps in modules
+            and self.config[AutomaticModules.swaps]["preapprove_routers"]
+        ):
+            self.idle_tasks.append(self.approve_swap_routers)
@@ -0,0 +1,94 @@
+import asyncio
+
+from loguru import logger
+
+from config import BRIDGE_DEFAULT_LATENCY, BRIDGE_GAS_LIMITS
+from settings import BRIDGE_HOUR_COST
+from utils.bridge_stats import BRIDGE_STATS
+from .account import Account
+from .layerswap import LayerSwap
+from .nitro import Nitro
+from .orbiter import Orbiter
+from .scroll import Scroll
+
+BRIDGES = {
+    "native": Scroll,
+    "orbiter": Orbiter,
+    "layerswap": LayerSwap,
+    "nitro": Nitro,
+}
+
+
+class BridgeSelector(Account):
+    """
+    Chooses the bridge for one transfer from live quotes.
+
+    Every service is quoted concurrently for its amount and route, and ranked
+    by fee plus source chain gas plus the expected settlement time priced at
+    BRIDGE_HOUR_COST per hour.
+    """
+
+    def __init__(self, account_id: int, private_key: str, chain: str) -> None:
+        super().__init__(account_id=account_id, private_key=private_key, chain=chain)
+
+    def get_latency(self, service: str, to_chain: str) -> float:
+        latency = BRIDGE_STATS.get_latency(service, self.chain, to_chain)
+        if latency is not None:
+            return latency
+
+        if service == "native":
+            direction = "in" if to_chain == "scroll" else "out"
+            return BRIDGE_DEFAULT_LATENCY[service][direction]
+
+        return BRIDGE_DEFAULT_LATENCY[service]
+
+    async def get_cost(
+        self, service: str, to_chain: str, amount_wei: int, gas_price: int
+    ):
+        bridge = BRIDGES[service](self.account_id, self.private_key, self.chain)
+
+        fee = await bridge.get_bridge_fee(to_chain, amount_wei)
+        if fee is None:
+            return None
+
+        latency = self.get_latency(service, to_chain)
+        waiting_cost = self.w3.to_wei(BRIDGE_HOUR_COST * latency / 3600, "ether")
+
+        return fee + gas_price * BRIDGE_GAS_LIMITS[service] + waiting_cost
+
+    async def choose(self, to_chain: str, amounts: dict) -> str:
+        """amounts - service -> wei the service would bridge"""
+        gas_price = await self.w3.eth.gas_price
+
+        services = list(amounts)
+        costs = await asyncio.gather(
+            *[
+                self.get_cost(service, to_chain, amounts[service], gas_price)
+                for service in services
+            ],
+            return_exceptions=True,
+        )
+
+        quotes = {}
+        for service, cost in zip(services, costs):
+            if isinstance(cost, Exception):
+                logger.error(
+                    f"[{self.account_id}][{self.address}] {service} quote failed | {cost}"
+                )
+            elif cost is not None:
+                quotes[service] = cost
+
+        if not quotes:
+            raise ValueError(f"No bridge available {self.chain} -> {to_chain}")
+
+        service = min(quotes, key=quotes.get)
+
+        logger.info(
+            f"[{self.account_id}][{self.address}] Bridge {self.chain} -> {to_chain} via {service} | "
+            + " | ".join(
+                f"{name}: {self.w3.from_wei(cost, 'ether'):.6f} ETH"
+                for name, cost in sorted(quotes.items(), key=lambda item: item[1])
+            )
+        )
+
+        return service
@@ -25,13 +25,7 @@ class Dmail(Account):
             data = self.contract.encodeABI("send_mail", args=(email, theme))
 
             tx_data = await self.get_tx_data()
-            tx_data.update(
-                {
-                    "data": data,
-                    "to": self.w3.to_checksum_address(DMAIL_CONTRACT),
-                    "gasPrice": await self.w3.eth.gas_price,
-                }
-            )
+            tx_data.update({"data": data, "to": DMAIL_CONTRACT})
 
             signed_txn = await self.sign(tx_data)
 
@@ -20,9 +20,7 @@ class L2Pass(Account):
         logger.info(f"[{self.account_id}][{self.address}] Mint L2Pass NFT")
 
         try:
-            contract = self.get_contract(
-                self.w3.to_checksum_address(L2PASS_CONTRACT), L2PASS_ABI
-            )
+            contract = self.get_contract(L2PASS_CONTRACT, L2PASS_ABI)
 
             mint_price = await self.get_mint_price(contract)
 
@@ -2,6 +2,7 @@ import random
 from typing import Dict
 
 from loguru import logger
+from web3.types import TxReceipt
 
 from utils.gas_checker import check_gas
 from utils.helpers import retry
@@ -73,12 +74,12 @@ class L2Telegraph(Account):
 
         return int(fee[0] * 1.2)
 
-    async def get_nft_id(self, txn_hash: str):
-        receipts = await self.w3.eth.get_transaction_receipt(txn_hash)
+    def get_nft_id(self, receipt: TxReceipt) -> int:
+        contract = self.get_contract(L2TELEGRAPH_NFT_CONTRACT, L2TELEGRAPH_NFT_ABI)
 
-        nft_id = int(receipts["logs"][0]["topics"][-1].hex(), 0)
+        transfer = self.decode_events(receipt, contract, "Transfer")[0]
 
-        return nft_id
+        return transfer["args"]["tokenId"]
 
     @retry
     async def send_message(self, use_chain: list):
@@ -135,9 +136,9 @@ class L2Telegraph(Account):
 
             txn_hash = await self.send_raw_transaction(signed_txn)
 
-            await self.wait_until_tx_finished(txn_hash.hex())
+            receipt = await self.wait_until_tx_finished(txn_hash.hex())
 
-            nft_id = await self.get_nft_id(txn_hash.hex())
+            nft_id = self.get_nft_id(receipt)
 
             return nft_id
         except Exception as e:
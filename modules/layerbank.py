@@ -50,7 +50,7 @@ class LayerBank(Account):
             tx_data = await self.get_tx_data(amount_wei)
 
             transaction = await self.contract.functions.supply(
-                self.w3.to_checksum_address(LAYERBANK_WETH_CONTRACT),
+                LAYERBANK_WETH_CONTRACT,
                 amount_wei,
             ).build_transaction(tx_data)
 
@@ -93,7 +93,7 @@ class LayerBank(Account):
                 tx_data = await self.get_tx_data()
 
                 transaction = await self.contract.functions.redeemUnderlying(
-                    self.w3.to_checksum_address(LAYERBANK_WETH_CONTRACT),
+                    LAYERBANK_WETH_CONTRACT,
                     amount,
                 ).build_transaction(tx_data)
 
@@ -102,6 +102,10 @@ class LayerBank(Account):
                 txn_hash = await self.send_raw_transaction(signed_txn)
 
                 await self.wait_until_tx_finished(txn_hash.hex())
+
+                self.spend_allowance(
+                    amount, LAYERBANK_WETH_CONTRACT, LAYERBANK_CONTRACT
+                )
             else:
                 logger.error(f"[{self.account_id}][{self.address}] Deposit not found")
         except Exception as e:
@@ -1,13 +1,20 @@
-from typing import Union, Dict
+import time
+from typing import Union, Dict, Optional
 
 import aiohttp
 from loguru import logger
 
+from config import BRIDGE_ROUTES_TTL
 from settings import LAYERSWAP_API_KEY
+from utils.bridge_stats import BRIDGE_STATS
+from utils.cache import TTLCache
 from utils.gas_checker import check_gas
 from utils.helpers import retry
 from .account import Account
 
+# (service, from_chain, to_chain) -> route limits, shared by all accounts
+BRIDGE_ROUTES = TTLCache(ttl=BRIDGE_ROUTES_TTL)
+
 
 class LayerSwap(Account):
     def __init__(self, account_id: int, private_key: str, chain: str) -> None:
@@ -53,12 +60,10 @@ class LayerSwap(Account):
 
                     return False
             else:
-                logger.error(
-                    f"[{self.account_id}][{self.address}][{self.chain}] Bad layerswap request"
+                raise Exception(
+                    f"Bad layerswap request | {response.status} {await response.text()}"
                 )
 
-                return False
-
     async def get_swap_rate(self, from_chain: str, to_chain: str) -> Union[Dict, bool]:
         url = "https://api.layerswap.io/api/swap_rate"
 
@@ -85,11 +90,44 @@ class LayerSwap(Account):
 
                     return False
             else:
-                logger.error(
-                    f"[{self.account_id}][{self.address}][{self.chain}] Bad layerswap request"
+                raise Exception(
+                    f"Bad layerswap request | {response.status} {await response.text()}"
                 )
 
-                return False
+    async def load_route(self, from_chain: str, to_chain: str) -> Union[Dict, bool]:
+        """
+        Swap rate of the route, False if LayerSwap doesn't offer it. Failed
+        requests raise, so they are not cached like an unavailable route.
+        """
+        if await self.check_available_route(from_chain, to_chain) is False:
+            return False
+
+        return await self.get_swap_rate(from_chain, to_chain)
+
+    async def get_route(self, from_chain: str, to_chain: str) -> Union[Dict, bool]:
+        """Swap rate of an available route, False if there is none"""
+        try:
+            return await BRIDGE_ROUTES.get(
+                ("layerswap", from_chain, to_chain),
+                lambda: self.load_route(from_chain, to_chain),
+            )
+        except Exception as e:
+            logger.error(
+                f"[{self.account_id}][{self.address}][{self.chain}] Couldn't load Layerswap route {from_chain} -> {to_chain} | {e}"
+            )
+            raise e
+
+    async def get_bridge_fee(self, to_chain: str, amount_wei: int) -> Optional[int]:
+        """Wei lost on the way, None if the route is unavailable for the amount"""
+        swap_rate = await self.get_route(self.chain, to_chain)
+        if swap_rate is False:
+            return None
+
+        amount = float(self.w3.from_wei(amount_wei, "ether"))
+        if amount < swap_rate["min_amount"] or amount > swap_rate["max_amount"]:
+            return None
+
+        return self.w3.to_wei(swap_rate["fee_amount"], "ether")
 
     async def create_swap(
         self, from_chain: str, to_chain: str, amount: float
@@ -190,13 +228,11 @@ class LayerSwap(Account):
                 dst_account.address
             )
 
-            available_route = await self.check_available_route(self.chain, to_chain)
+            swap_rate = await self.get_route(self.chain, to_chain)
 
-            if available_route is False:
+            if swap_rate is False:
                 return
 
-            swap_rate = await self.get_swap_rate(self.chain, to_chain)
-
             if amount < swap_rate["min_amount"] or amount > swap_rate["max_amount"]:
                 logger.error(
                     f"[{self.account_id}][{self.address}][{self.chain}] Limit range amount for bridge "
@@ -204,9 +240,6 @@ class LayerSwap(Account):
                 )
                 return
 
-            if swap_rate is False:
-                return
-
             swap_path = await self.get_swap_path(self.chain, to_chain, amount)
 
             if swap_path is False:
@@ -219,15 +252,19 @@ class LayerSwap(Account):
 
             signed_txn = await self.sign(tx_data)
 
+            started = time.time()
             txn_hash = await self.send_raw_transaction(signed_txn)
 
             await self.wait_until_tx_finished(txn_hash.hex())
 
-            await self.wait_for_balance_increase(
+            if await self.wait_for_balance_increase(
                 balance_wei=cur_dst_balance_wei,
                 increase_amount_wei=tx_data["value"],
                 chain=to_chain,
-            )
+            ):
+                BRIDGE_STATS.record(
+                    "layerswap", self.chain, to_chain, time.time() - started
+                )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Bridge on LayerSwap Error | {e}"
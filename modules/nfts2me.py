@@ -23,7 +23,6 @@ class Minter(Account):
             tx_data = await self.get_tx_data(self.w3.to_wei(item[1], "ether"))
 
             transaction = await contract.functions.mint(1).build_transaction(tx_data)
-            transaction["gas"] = int(transaction["gas"] * 1.2)
 
             signed_txn = await self.sign(transaction)
 
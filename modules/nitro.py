@@ -1,8 +1,15 @@
+import asyncio
+import time
+from typing import Optional
+
 import aiohttp
 from loguru import logger
+from utils.bridge_stats import BRIDGE_STATS
 from utils.gas_checker import check_gas
 from utils.helpers import retry
+from utils.watchers import get_log_watcher
 from .account import Account
+from config import BRIDGE_EVENT_TOPICS
 from settings import BRIDGE_FEES
 
 
@@ -39,6 +46,41 @@ class Nitro(Account):
 
             return transaction_data
 
+    async def get_bridge_fee(self, to_chain: str, amount_wei: int) -> Optional[int]:
+        """Wei lost on the way, None if the route is unavailable"""
+        quote = await self.get_quote(amount_wei, to_chain)
+
+        if "destination" not in quote:
+            return None
+
+        return amount_wei - int(quote["destination"]["tokenAmount"])
+
+    def watch_payout(self, to_chain: str, receipt) -> Optional[asyncio.Future]:
+        """
+        Future resolved with the payout of the deposit made in receipt on
+        to_chain, None if the receipt has no Nitro deposit event. The asset
+        forwarder has the same address on every chain.
+        """
+        for log in receipt["logs"]:
+            if log["topics"] and log["topics"][0].hex() == BRIDGE_EVENT_TOPICS[
+                "nitro_deposit"
+            ]:
+                break
+        else:
+            return None
+
+        deposit_id = self.w3.codec.decode(
+            ["uint256", "uint256", "bytes32", "uint256", "uint256"],
+            bytes(log["data"])[: 5 * 32],
+        )[4]
+
+        return get_log_watcher(to_chain).watch(
+            log["address"],
+            [BRIDGE_EVENT_TOPICS["nitro_payout"]],
+            # the uint256 nonce is the last word of the data
+            lambda payout: int(payout["data"][-64:], 16) == deposit_id,
+        )
+
     async def build_transaction(self, params: dict):
         url = "https://api-beta.pathfinder.routerprotocol.com/api/v2/transaction"
 
@@ -107,15 +149,26 @@ class Nitro(Account):
 
             signed_txn = await self.sign(tx_data)
 
+            started = time.time()
             txn_hash = await self.send_raw_transaction(signed_txn)
 
-            await self.wait_until_tx_finished(txn_hash.hex())
+            receipt = await self.wait_until_tx_finished(txn_hash.hex())
 
-            await self.wait_for_balance_increase(
+            arrival = self.watch_payout(to_chain, receipt)
+            if arrival is None:
+                logger.warning(
+                    f"[{self.account_id}][{self.address}] Nitro deposit event not found, waiting for the balance on {to_chain}"
+                )
+
+            if await self.wait_for_balance_increase(
                 balance_wei=cur_dst_balance_wei,
                 increase_amount_wei=tx_data["value"],
                 chain=to_chain,
-            )
+                arrival=arrival,
+            ):
+                BRIDGE_STATS.record(
+                    "nitro", self.chain, to_chain, time.time() - started
+                )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Bridge Nitro Error | {e}"
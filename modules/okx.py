@@ -1,19 +1,298 @@
 import asyncio
-import base64
-import hmac
 import random
 import time
+from functools import partial
 from typing import Union
-import ccxt
-import requests
+import ccxt.async_support as ccxt
 from modules.account import Account
-from config import RPC
+from config import (
+    OKX_FEES_TTL,
+    OKX_FUNDING_BALANCE_POLL,
+    OKX_SUBACCOUNTS_SWEEP_INTERVAL,
+    OKX_WITHDRAWAL_BALANCE_TIMEOUT,
+    OKX_WITHDRAWAL_HISTORY_LIMIT,
+    OKX_WITHDRAWAL_POLL_MAX,
+    OKX_WITHDRAWAL_POLL_MIN,
+    OKX_WITHDRAWAL_TIMEOUT,
+    OKX_WITHDRAWALS_PER_SECOND,
+    RPC,
+)
 from loguru import logger
-import datetime
 
+from utils.cache import TTLCache
 from utils.gas_checker import check_gas
 
 
+OKX_CLIENTS = {}
+
+# (token, chainName) -> withdrawal fee, shared by all accounts
+OKX_WITHDRAWAL_FEES = TTLCache(ttl=OKX_FEES_TTL)
+
+# finished sweeps are remembered for the interval, so accounts share one sweep
+OKX_SUBACCOUNT_SWEEPS = TTLCache(ttl=OKX_SUBACCOUNTS_SWEEP_INTERVAL)
+
+
+def get_okx_client(credentials: dict) -> ccxt.okx:
+    """Returns the process-wide client for the api key, so all accounts share its rate limiter"""
+    if credentials["apikey"] not in OKX_CLIENTS:
+        OKX_CLIENTS[credentials["apikey"]] = ccxt.okx(
+            config={
+                "apiKey": credentials["apikey"],
+                "secret": credentials["apisecret"],
+                "password": credentials["passphrase"],
+                "enableRateLimit": True,
+            }
+        )
+
+    return OKX_CLIENTS[credentials["apikey"]]
+
+
+class WithdrawalPoller:
+    """
+    Tracks every pending withdrawal of one OKX client.
+
+    The withdrawal history since the oldest pending withdrawal is requested
+    once per interval for all of them together. The interval drops to the
+    minimum whenever a withdrawal is added or resolved and doubles up to the
+    maximum while nothing changes. Waiters give up after OKX_WITHDRAWAL_TIMEOUT.
+    """
+
+    def __init__(self, client: ccxt.okx) -> None:
+        self.client = client
+        self.pending = {}
+        # withdrawal id -> milliseconds timestamp it started waiting at
+        self.added = {}
+        self.interval = OKX_WITHDRAWAL_POLL_MIN
+        self.task = None
+
+    async def wait(self, wd_id) -> dict:
+        """Returns the withdrawal once its status is no longer pending"""
+        wd_id = str(wd_id)
+        if wd_id not in self.pending:
+            self.pending[wd_id] = asyncio.get_running_loop().create_future()
+            self.added[wd_id] = int(time.time() * 1000)
+
+        self.interval = OKX_WITHDRAWAL_POLL_MIN
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(self.pending[wd_id]), OKX_WITHDRAWAL_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            self.pending.pop(wd_id, None)
+            self.added.pop(wd_id, None)
+            raise ValueError(
+                f"OKX withdrawal {wd_id} is still pending after {OKX_WITHDRAWAL_TIMEOUT} seconds"
+            )
+
+    async def run(self):
+        while self.pending:
+            await asyncio.sleep(self.interval)
+
+            # a minute earlier covers the clock difference with OKX
+            since = min(self.added.values(), default=0) - 60 * 1000
+
+            try:
+                withdrawals = {
+                    withdrawal["id"]: withdrawal
+                    for withdrawal in await self.client.fetch_withdrawals(
+                        since=since, limit=OKX_WITHDRAWAL_HISTORY_LIMIT
+                    )
+                }
+            except Exception as error:
+                logger.error(f"Couldn't fetch OKX withdrawals | {error}")
+                continue
+
+            resolved = False
+            for wd_id in list(self.pending):
+                withdrawal = withdrawals.get(wd_id)
+                if withdrawal is None:
+                    # not in the history yet, or beyond the limit of this request
+                    continue
+                if withdrawal["status"] == "pending":
+                    logger.debug(f"OKX Withdraw Pending | response: {withdrawal}")
+                    continue
+
+                future = self.pending.pop(wd_id)
+                self.added.pop(wd_id, None)
+                if not future.done():
+                    future.set_result(withdrawal)
+                resolved = True
+
+            if resolved:
+                self.interval = OKX_WITHDRAWAL_POLL_MIN
+            else:
+                self.interval = min(self.interval * 2, OKX_WITHDRAWAL_POLL_MAX)
+
+
+class WithdrawalQueue:
+    """
+    Serializes withdrawals of one OKX client.
+
+    Accounts are served in the order they asked for a withdrawal (asyncio.Lock
+    is FIFO) and a request is only sent once the funding account holds the
+    amount plus fee, so OKX doesn't reject it. Accounts waiting for funds don't
+    hold the lock, the others keep withdrawing meanwhile. Requests are spaced
+    to stay within OKX_WITHDRAWALS_PER_SECOND.
+    """
+
+    def __init__(self, client: ccxt.okx) -> None:
+        self.client = client
+        self.lock = asyncio.Lock()
+        self.last_request = 0
+        # one funding balance request per poll interval for all waiting accounts
+        self.balances = TTLCache(ttl=OKX_FUNDING_BALANCE_POLL)
+
+    async def withdraw(
+        self, token: str, amount: float, fee: float, address: str, params: dict
+    ) -> dict:
+        amount_with_fee = amount + float(fee)
+        deadline = time.time() + OKX_WITHDRAWAL_BALANCE_TIMEOUT
+
+        while True:
+            async with self.lock:
+                # withdrawals sent since the last check have spent part of it
+                self.balances.invalidate(token)
+                available = await self.get_available(token)
+
+                if available >= amount_with_fee:
+                    await asyncio.sleep(
+                        self.last_request + 1 / OKX_WITHDRAWALS_PER_SECOND - time.time()
+                    )
+                    self.last_request = time.time()
+                    self.balances.invalidate(token)
+
+                    return await self.client.withdraw(
+                        token, amount, address, params=params
+                    )
+
+            await self.wait_for_balance(token, amount_with_fee, deadline)
+
+    async def get_available(self, token: str) -> float:
+        balance = await self.balances.get(
+            token, lambda: self.client.fetch_balance(params={"type": "funding"})
+        )
+
+        return balance.get(token, {}).get("free") or 0
+
+    async def wait_for_balance(self, token: str, amount: float, deadline: float):
+        while True:
+            available = await self.get_available(token)
+
+            if available >= amount:
+                return
+
+            if time.time() > deadline:
+                raise ValueError(
+                    f"OKX funding balance {available} {token} is lower than {amount} {token}"
+                )
+
+            logger.info(
+                f"OKX funding balance {available} {token} is lower than {amount} {token}, waiting for funds"
+            )
+            await asyncio.sleep(OKX_FUNDING_BALANCE_POLL)
+
+
+OKX_WITHDRAWAL_QUEUES = {}
+
+
+def get_withdrawal_queue(credentials: dict) -> WithdrawalQueue:
+    if credentials["apikey"] not in OKX_WITHDRAWAL_QUEUES:
+        OKX_WITHDRAWAL_QUEUES[credentials["apikey"]] = WithdrawalQueue(
+            get_okx_client(credentials)
+        )
+
+    return OKX_WITHDRAWAL_QUEUES[credentials["apikey"]]
+
+
+OKX_WITHDRAWAL_POLLERS = {}
+
+
+def get_withdrawal_poller(credentials: dict) -> WithdrawalPoller:
+    if credentials["apikey"] not in OKX_WITHDRAWAL_POLLERS:
+        OKX_WITHDRAWAL_POLLERS[credentials["apikey"]] = WithdrawalPoller(
+            get_okx_client(credentials)
+        )
+
+    return OKX_WITHDRAWAL_POLLERS[credentials["apikey"]]
+
+
+async def sweep_subaccounts(credentials: dict):
+    logger.info("Transfering ETH from OKX subaccounts")
+
+    client = get_okx_client(credentials)
+
+    list_sub = None
+    try:
+        list_sub = await client.privateGetUsersSubaccountList()
+
+        # requests are spaced by the shared client according to OKX rate limits
+        sub_balances = await asyncio.gather(
+            *[
+                client.privateGetAssetSubaccountBalances(
+                    {"subAcct": sub_data["subAcct"], "ccy": "ETH"}
+                )
+                for sub_data in list_sub["data"]
+            ]
+        )
+
+        transfers = []
+        for sub_data, sub_balance in zip(list_sub["data"], sub_balances):
+            name_sub = sub_data["subAcct"]
+            if not sub_balance["data"]:
+                continue
+
+            sub_balance = sub_balance["data"][0]["bal"]
+
+            logger.info(f"{name_sub} | sub_balance : {sub_balance} ETH")
+
+            if float(sub_balance) <= 0:
+                continue
+
+            transfers.append(
+                client.privatePostAssetTransfer(
+                    {
+                        "ccy": "ETH",
+                        "amt": str(sub_balance),
+                        "from": "6",
+                        "to": "6",
+                        "type": "2",
+                        "subAcct": name_sub,
+                    }
+                )
+            )
+
+        for response in await asyncio.gather(*transfers):
+            logger.debug(f"Subaccount transfer | response: {response}")
+
+    except Exception as error:
+        logger.error(
+            f"Transfer ETH from subaccounts Error: {error}. list_sub : {list_sub}"
+        )
+        raise error
+
+
+async def transfer_from_subaccounts(credentials: dict):
+    """
+    Moves ETH from all subaccounts to the main account, once per sweep interval
+    for the whole run. A failed sweep is not remembered, the next call retries it.
+    """
+    await OKX_SUBACCOUNT_SWEEPS.get(
+        credentials["apikey"], partial(sweep_subaccounts, credentials)
+    )
+
+
+async def close_okx_clients():
+    for client in OKX_CLIENTS.values():
+        await client.close()
+
+    OKX_CLIENTS.clear()
+    OKX_WITHDRAWAL_POLLERS.clear()
+    OKX_WITHDRAWAL_QUEUES.clear()
+
+
 class OKX(Account):
     def __init__(
         self,
@@ -33,44 +312,29 @@ class OKX(Account):
         if self.okx_network_name is None:
             raise ValueError(f"Couldn't get the okx network name for {chain}")
 
-        self.client = ccxt.okx(
-            config={
-                "apiKey": self.credentials["apikey"],
-                "secret": self.credentials["apisecret"],
-                "password": self.credentials["passphrase"],
-                "enableRateLimit": True,
-            }
-        )
+        self.client = get_okx_client(self.credentials)
 
     async def wait_for_withdrawal(self, txid):
         logger.info(
             f"[{self.account_id}][{self.address}] Waiting for OKX withdrawal to complete| txid: {txid}"
         )
-        while True:
-            # fetch recent withdrawals
-            withdrawal = self.client.fetch_withdrawal(id=txid)
-
-            if withdrawal["status"] == "ok":
-                return
-            elif withdrawal["status"] == "failed":
-                raise ValueError(
-                    f"[{self.account_id}][{self.address}] OKX Withdraw Failed | response: {withdrawal}"
-                )
-            elif withdrawal["status"] == "canceled":
-                raise ValueError(
-                    f"[{self.account_id}][{self.address}] OKX Withdraw Canceled | response: {withdrawal}"
-                )
-            elif withdrawal["status"] == "pending":
-                logger.debug(
-                    f"[{self.account_id}][{self.address}] OKX Withdraw Pending | response: {withdrawal}"
-                )
-            else:
-                raise ValueError(
-                    f"[{self.account_id}][{self.address}] OKX Withdraw Unknown Status | response: {withdrawal}"
-                )
-
-            # wait before checking again
-            await asyncio.sleep(60)
+        withdrawal = await get_withdrawal_poller(self.credentials).wait(txid)
+
+        if withdrawal["status"] == "ok":
+            self.get_state().invalidate()
+            return
+        elif withdrawal["status"] == "failed":
+            raise ValueError(
+                f"[{self.account_id}][{self.address}] OKX Withdraw Failed | response: {withdrawal}"
+            )
+        elif withdrawal["status"] == "canceled":
+            raise ValueError(
+                f"[{self.account_id}][{self.address}] OKX Withdraw Canceled | response: {withdrawal}"
+            )
+        else:
+            raise ValueError(
+                f"[{self.account_id}][{self.address}] OKX Withdraw Unknown Status | response: {withdrawal}"
+            )
 
     @check_gas
     async def withdraw(
@@ -83,15 +347,16 @@ class OKX(Account):
         )
 
         if transfer_from_subaccounts:
-            await self.transfer_from_subaccounts()
+            await transfer_from_subaccounts(self.credentials)
 
         try:
             chainName = token + "-" + self.okx_network_name
-            fee = self.get_withdrawal_fee(token, chainName)
+            fee = await self.get_withdrawal_fee(token, chainName)
 
-            response = self.client.withdraw(
+            response = await get_withdrawal_queue(self.credentials).withdraw(
                 token,
                 amount_to_withdraw,
+                fee,
                 self.address,
                 params={
                     "toAddr": self.address,
@@ -117,28 +382,29 @@ class OKX(Account):
 
         return True
 
-    def get_withdrawal_fee(self, token, chainName):
-        currencies = self.client.fetch_currencies()
-        for currency in currencies:
-            if currency == token:
-                currency_info = currencies[currency]
-                network_info = currency_info.get("networks", None)
-                if network_info:
-                    for cur_network in network_info:
-                        network_data = network_info[cur_network]
-                        network_id = network_data["id"]
-                        if network_id == chainName:
-                            withdrawal_fee = currency_info["networks"][cur_network][
-                                "fee"
-                            ]
-                            if withdrawal_fee == 0:
-                                return 0
-                            else:
-                                return withdrawal_fee
-        raise ValueError(
-            f"Couldn't get the withdrawal fee for {token=} and {chainName=}"
+    async def get_withdrawal_fee(self, token, chainName):
+        fees = await OKX_WITHDRAWAL_FEES.get(
+            self.credentials["apikey"], self.load_withdrawal_fees
         )
 
+        if (token, chainName) not in fees:
+            raise ValueError(
+                f"Couldn't get the withdrawal fee for {token=} and {chainName=}"
+            )
+
+        return fees[(token, chainName)]
+
+    async def load_withdrawal_fees(self):
+        currencies = await self.client.fetch_currencies()
+
+        fees = {}
+        for token, currency_info in currencies.items():
+            network_info = currency_info.get("networks", None) or {}
+            for network_data in network_info.values():
+                fees[(token, network_data["id"])] = network_data["fee"]
+
+        return fees
+
     async def deposit(self, address, min_amount_left, max_amount_left):
         """Deposit funds from wallet to okx. Only ETH token supported"""
 
@@ -146,35 +412,30 @@ class OKX(Account):
             random.uniform(min_amount_left, max_amount_left), 6
         )
 
-        balance = await self.w3.eth.get_balance(self.address)
-
-        amount = int(balance - amount_leave_on_wallet * 10**18)
-        logger.info(
-            f"[{self.account_id}][{self.address}] Depositing to OKX | {amount / 10**18} ETH"
+        chain_id, nonce = await asyncio.gather(
+            self.w3.eth.chain_id,
+            self.w3.eth.get_transaction_count(self.address),
         )
 
-        amount -= self.w3.to_wei(0.00005, "ether")  # in case of inaccuracy
-
-        estimated_gas = await self.w3.eth.estimate_gas(
+        tx = await self.get_max_sendable(
             {
-                "from": self.address,
+                "chainId": chain_id,
                 "to": self.w3.to_checksum_address(address),
-                "value": amount,
-            }
+                "nonce": max(nonce, self.next_nonce),
+            },
+            reserve_wei=self.w3.to_wei(amount_leave_on_wallet, "ether"),
         )
-        estimated_gas_price = await self.w3.eth.gas_price
-        estimated_fee = estimated_gas * estimated_gas_price
+        amount = tx["value"]
 
-        value = amount - estimated_fee
+        if amount < 1:
+            logger.error(
+                f"[{self.account_id}][{self.address}] Insufficient funds! | {amount}"
+            )
+            raise Exception("Insufficient funds!")
 
-        tx = {
-            "chainId": await self.w3.eth.chain_id,
-            "to": self.w3.to_checksum_address(address),
-            "nonce": await self.w3.eth.get_transaction_count(self.address),
-            "gas": estimated_gas,
-            "gasPrice": await self.w3.eth.gas_price,
-            "value": value,
-        }
+        logger.info(
+            f"[{self.account_id}][{self.address}] Depositing to OKX | {amount / 10**18} ETH"
+        )
 
         try:
             signed_tx = await self.sign(tx)
@@ -194,109 +455,3 @@ class OKX(Account):
             raise e
 
         return True
-
-    async def transfer_from_subaccounts(self):
-        logger.info(
-            f"[{self.account_id}][{self.address}] Transfering ETH from subaccounts"
-        )
-
-        try:
-            _, _, headers = self.build_request(
-                request_path=f"/api/v5/users/subaccount/list", meth="GET"
-            )
-            list_sub = requests.get(
-                "https://www.okx.cab/api/v5/users/subaccount/list",
-                timeout=10,
-                headers=headers,
-            )
-            list_sub = list_sub.json()
-
-            for sub_data in list_sub["data"]:
-                name_sub = sub_data["subAcct"]
-
-                _, _, headers = self.build_request(
-                    request_path=f"/api/v5/asset/subaccount/balances?subAcct={name_sub}&ccy=ETH",
-                    meth="GET",
-                )
-
-                sub_balance = requests.get(
-                    f"https://www.okx.cab/api/v5/asset/subaccount/balances?subAcct={name_sub}&ccy=ETH",
-                    timeout=10,
-                    headers=headers,
-                )
-                sub_balance = sub_balance.json()
-                sub_balance = sub_balance["data"][0]["bal"]
-
-                logger.info(
-                    f"[{self.account_id}][{self.address}]{name_sub} | sub_balance : {sub_balance} ETH"
-                )
-
-                body = {
-                    "ccy": "ETH",
-                    "amt": str(sub_balance),
-                    "from": 6,
-                    "to": 6,
-                    "type": "2",
-                    "subAcct": name_sub,
-                }
-                _, _, headers = self.build_request(
-                    request_path=f"/api/v5/asset/transfer", body=str(body), meth="POST"
-                )
-                a = requests.post(
-                    "https://www.okx.cab/api/v5/asset/transfer",
-                    data=str(body),
-                    timeout=10,
-                    headers=headers,
-                )
-                a = a.json()
-                print(a)
-                await asyncio.sleep(1)
-
-        except Exception as error:
-            logger.error(
-                f"[{self.account_id}][{self.address}] Transfer ETH from subaccounts Error: {error}. list_sub : {list_sub}"
-            )
-
-    def build_request(
-        self, request_path="/api/v5/account/balance?ccy=USDT", body="", meth="GET"
-    ):
-        def signature(
-            timestamp: str,
-            method: str,
-            request_path: str,
-            secret_key: str,
-            body: str = "",
-        ) -> str:
-            if not body:
-                body = ""
-
-            message = timestamp + method.upper() + request_path + body
-            mac = hmac.new(
-                bytes(secret_key, encoding="utf-8"),
-                bytes(message, encoding="utf-8"),
-                digestmod="sha256",
-            )
-            d = mac.digest()
-            return base64.b64encode(d).decode("utf-8")
-
-        try:
-            dt_now = datetime.datetime.utcnow()
-            ms = str(dt_now.microsecond).zfill(6)[:3]
-            timestamp = f"{dt_now:%Y-%m-%dT%H:%M:%S}.{ms}Z"
-
-            base_url = "https://www.okex.com"
-            headers = {
-                "Content-Type": "application/json",
-                "OK-ACCESS-KEY": self.credentials["apikey"],
-                "OK-ACCESS-SIGN": signature(
-                    timestamp, meth, request_path, self.credentials["apisecret"], body
-                ),
-                "OK-ACCESS-TIMESTAMP": timestamp,
-                "OK-ACCESS-PASSPHRASE": self.credentials["passphrase"],
-                "x-simulated-trading": "0",
-            }
-        except Exception as ex:
-            logger.error(
-                f"[{self.account_id}][{self.address}] Building request failed error: {ex}"
-            )
-        return base_url, request_path, headers
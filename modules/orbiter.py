@@ -1,8 +1,12 @@
+import time
+from typing import Optional
+
 import aiohttp
 from loguru import logger
 
 from settings import BRIDGE_FEES
 from utils.gas_checker import check_gas
+from utils.bridge_stats import BRIDGE_STATS
 from utils.helpers import retry
 from .account import Account
 from config import ORBITER_CONTRACT
@@ -64,6 +68,17 @@ class Orbiter(Account):
 
                 return False
 
+    async def get_bridge_fee(self, to_chain: str, amount_wei: int) -> Optional[int]:
+        """Wei paid on top of amount_wei, None if the route is unavailable"""
+        bridge_amount = await self.get_bridge_amount(
+            self.chain, to_chain, self.w3.from_wei(amount_wei, "ether")
+        )
+
+        if bridge_amount is False:
+            return None
+
+        return bridge_amount - amount_wei
+
     @retry
     async def bridge(
         self,
@@ -76,6 +91,8 @@ class Orbiter(Account):
         max_percent: int,
     ):
         try:
+            # filled with the gas and fees an all_amount is computed with
+            transaction = {"to": ORBITER_CONTRACT}
             amount_wei, amount, balance = await self.get_amount(
                 "ETH",
                 min_amount,
@@ -85,6 +102,7 @@ class Orbiter(Account):
                 min_percent,
                 max_percent,
                 fee_cost_wei=self.w3.to_wei(BRIDGE_FEES["orbiter"], "ether"),
+                transaction=transaction,
             )
 
             dst_account = Account(
@@ -111,25 +129,39 @@ class Orbiter(Account):
             if bridge_amount is False:
                 return
 
-            balance = await self.w3.eth.get_balance(self.address)
+            balance = (await self.get_cached_balance())["balance_wei"]
 
             if bridge_amount > balance:
                 logger.error(f"[{self.account_id}][{self.address}] Insufficient funds!")
             else:
                 tx_data = await self.get_tx_data(bridge_amount)
-                tx_data.update({"to": self.w3.to_checksum_address(ORBITER_CONTRACT)})
+                tx_data.update({"to": ORBITER_CONTRACT})
+                if all_amount:
+                    tx_data.update(
+                        {
+                            key: value
+                            for key, value in transaction.items()
+                            if key not in ("value", "nonce", "chainId")
+                        }
+                    )
 
                 signed_txn = await self.sign(tx_data)
 
+                started = time.time()
                 txn_hash = await self.send_raw_transaction(signed_txn)
 
                 await self.wait_until_tx_finished(txn_hash.hex())
 
-                await self.wait_for_balance_increase(
+                if await self.wait_for_balance_increase(
                     balance_wei=cur_dst_balance_wei,
                     increase_amount_wei=bridge_amount,
                     chain=to_chain,
-                )
+                    match_transfers=True,
+                    senders=[ORBITER_CONTRACT],
+                ):
+                    BRIDGE_STATS.record(
+                        "orbiter", self.chain, to_chain, time.time() - started
+                    )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Bridge on Orbiter Error | {e}"
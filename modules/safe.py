@@ -25,9 +25,7 @@ class GnosisSafe(Account):
                     1,
                     ZERO_ADDRESS,
                     "0x",
-                    self.w3.to_checksum_address(
-                        "0xf48f2B2d2a534e402487b3ee7C18c33Aec0Fe5e4"
-                    ),
+                    "0xf48f2B2d2a534e402487b3ee7C18c33Aec0Fe5e4",
                     ZERO_ADDRESS,
                     0,
                     ZERO_ADDRESS,
@@ -37,9 +35,7 @@ class GnosisSafe(Account):
             tx_data = await self.get_tx_data()
 
             transaction = await self.contract.functions.createProxyWithNonce(
-                self.w3.to_checksum_address(
-                    "0x3E5c63644E683549055b9Be8653de26E0B4CD36E"
-                ),
+                "0x3E5c63644E683549055b9Be8653de26E0B4CD36E",
                 setup_data,
                 int(time.time() * 1000),
             ).build_transaction(tx_data)
@@ -1,24 +1,77 @@
+import asyncio
+import time
+from typing import Optional
+
 from loguru import logger
 
 from settings import BRIDGE_FEES
+from utils.bridge_stats import BRIDGE_STATS
+from utils.cache import TTLCache
 from utils.gas_checker import check_gas
 from utils.helpers import retry
+from utils.watchers import address_topic, get_log_watcher
 from .account import Account
 
 from config import (
     BRIDGE_CONTRACTS,
+    BRIDGE_EVENT_TOPICS,
     DEPOSIT_ABI,
     WITHDRAW_ABI,
     ORACLE_ABI,
+    RPC,
+    SCROLL_DEPOSIT_FEE_MARGIN,
+    SCROLL_DEPOSIT_GAS_LIMIT,
     SCROLL_TOKENS,
+    SCROLL_WITHDRAW_GAS_LIMIT,
     WETH_ABI,
 )
 
+# L2 base fee from the L1 message queue oracle, refreshed once per L1 block
+L2_BASE_FEE = TTLCache(ttl=RPC["ethereum"]["block_time"])
+
 
 class Scroll(Account):
     def __init__(self, account_id: int, private_key: str, chain: str) -> None:
         super().__init__(account_id=account_id, private_key=private_key, chain=chain)
 
+    async def get_l2_base_fee(self) -> int:
+        oracle = self.get_contract(BRIDGE_CONTRACTS["oracle"], ORACLE_ABI)
+
+        return await oracle.functions.l2BaseFee().call()
+
+    def watch_finalize(
+        self, chain: str, gateway: str, event: str, amount_wei: int
+    ) -> asyncio.Future:
+        """
+        Future resolved with the finalize event of the gateway that pays
+        amount_wei from this wallet to itself on chain
+        """
+        wallet = address_topic(self.address)
+
+        return get_log_watcher(chain).watch(
+            BRIDGE_CONTRACTS[gateway],
+            [BRIDGE_EVENT_TOPICS[event], wallet, wallet],
+            # data starts with the uint256 amount
+            lambda log: int(log["data"][2:66], 16) == amount_wei,
+        )
+
+    async def get_deposit_fee(self) -> int:
+        """Fee the L1 messenger charges for relaying a deposit to L2"""
+        l2_base_fee = await L2_BASE_FEE.get("l2BaseFee", self.get_l2_base_fee)
+
+        return l2_base_fee * SCROLL_DEPOSIT_GAS_LIMIT
+
+    async def get_bridge_fee(self, to_chain: str, amount_wei: int) -> Optional[int]:
+        """
+        Wei paid on top of amount_wei, None if the route is not native.
+        Withdrawals to Ethereum are not offered, they only arrive after a manual
+        claim on L1 that is never made here.
+        """
+        if self.chain == "ethereum" and to_chain == "scroll":
+            return await self.get_deposit_fee()
+
+        return None
+
     @retry
     async def deposit(
         self,
@@ -38,6 +91,7 @@ class Scroll(Account):
                 all_amount,
                 min_percent,
                 max_percent,
+                # depositETH needs the amount to be estimated, a fixed reserve
                 fee_cost_wei=self.w3.to_wei(BRIDGE_FEES["native"]["in"], "ether"),
             )
 
@@ -56,27 +110,35 @@ class Scroll(Account):
 
             contract = self.get_contract(BRIDGE_CONTRACTS["deposit"], DEPOSIT_ABI)
 
-            fee = self.w3.to_wei(0.0002, "ether")
+            # l2BaseFee may rise before inclusion, the excess is refunded
+            fee = int(await self.get_deposit_fee() * SCROLL_DEPOSIT_FEE_MARGIN)
 
-            tx_data = await self.get_tx_data(amount_wei + fee, False)
+            tx_data = await self.get_tx_data(amount_wei + fee)
 
             transaction = await contract.functions.depositETH(
                 amount_wei,
-                168000,
+                SCROLL_DEPOSIT_GAS_LIMIT,
             ).build_transaction(tx_data)
 
             signed_txn = await self.sign(transaction)
 
+            started = time.time()
             txn_hash = await self.send_raw_transaction(signed_txn)
 
             await self.wait_until_tx_finished(txn_hash.hex())
 
-            await self.wait_for_balance_increase(
+            if await self.wait_for_balance_increase(
                 balance_wei=cur_dst_balance_wei,
-                increase_amount_wei=tx_data["value"],
+                increase_amount_wei=amount_wei,
                 chain="scroll",
                 fee_inaccuracy=0.003,
-            )
+                arrival=self.watch_finalize(
+                    "scroll", "eth_gateway_l2", "scroll_deposit", amount_wei
+                ),
+            ):
+                BRIDGE_STATS.record(
+                    "native", self.chain, "scroll", time.time() - started
+                )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Bridge to Scroll Error | {e}"
@@ -104,6 +166,7 @@ class Scroll(Account):
                 all_amount,
                 min_percent,
                 max_percent,
+                # withdrawETH needs the amount to be estimated, a fixed reserve
                 fee_cost_wei=self.w3.to_wei(BRIDGE_FEES["native"]["out"], "ether"),
             )
 
@@ -125,20 +188,27 @@ class Scroll(Account):
             tx_data = await self.get_tx_data(amount_wei)
 
             transaction = await contract.functions.withdrawETH(
-                amount_wei, 0
+                amount_wei, SCROLL_WITHDRAW_GAS_LIMIT
             ).build_transaction(tx_data)
 
             signed_txn = await self.sign(transaction)
 
+            started = time.time()
             txn_hash = await self.send_raw_transaction(signed_txn)
 
             await self.wait_until_tx_finished(txn_hash.hex())
 
-            await self.wait_for_balance_increase(
+            if await self.wait_for_balance_increase(
                 balance_wei=cur_dst_balance_wei,
                 increase_amount_wei=tx_data["value"],
                 chain="ethereum",
-            )
+                arrival=self.watch_finalize(
+                    "ethereum", "eth_gateway_l1", "scroll_withdraw", amount_wei
+                ),
+            ):
+                BRIDGE_STATS.record(
+                    "native", self.chain, "ethereum", time.time() - started
+                )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Bridge from Scroll Error | {e}"
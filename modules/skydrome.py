@@ -1,7 +1,6 @@
 import time
 
 from loguru import logger
-from web3 import Web3
 from config import SKYDROME_ROUTER_ABI, SKYDROME_CONTRACTS, SCROLL_TOKENS
 from utils.gas_checker import check_gas
 from utils.helpers import retry
@@ -21,8 +20,8 @@ class Skydrome(Account):
     ):
         min_amount_out, swap_type = await self.swap_contract.functions.getAmountOut(
             amount,
-            Web3.to_checksum_address(from_token),
-            Web3.to_checksum_address(to_token),
+            from_token,
+            to_token,
         ).call()
         return int(min_amount_out - (min_amount_out / 100 * slippage)), swap_type
 
@@ -41,8 +40,8 @@ class Skydrome(Account):
             min_amount_out,
             [
                 [
-                    Web3.to_checksum_address(SCROLL_TOKENS[from_token]),
-                    Web3.to_checksum_address(SCROLL_TOKENS[to_token]),
+                    SCROLL_TOKENS[from_token],
+                    SCROLL_TOKENS[to_token],
                     swap_type,
                 ]
             ],
@@ -55,7 +54,7 @@ class Skydrome(Account):
     async def swap_to_eth(
         self, from_token: str, to_token: str, amount: int, slippage: int
     ):
-        token_address = Web3.to_checksum_address(SCROLL_TOKENS[from_token])
+        token_address = SCROLL_TOKENS[from_token]
 
         await self.approve(amount, token_address, SKYDROME_CONTRACTS["router"])
 
@@ -72,8 +71,8 @@ class Skydrome(Account):
             min_amount_out,
             [
                 [
-                    Web3.to_checksum_address(SCROLL_TOKENS[from_token]),
-                    Web3.to_checksum_address(SCROLL_TOKENS[to_token]),
+                    SCROLL_TOKENS[from_token],
+                    SCROLL_TOKENS[to_token],
                     swap_type,
                 ]
             ],
@@ -125,6 +124,11 @@ class Skydrome(Account):
             txn_hash = await self.send_raw_transaction(signed_txn)
 
             await self.wait_until_tx_finished(txn_hash.hex())
+
+            if from_token != "ETH":
+                self.spend_allowance(
+                    amount_wei, SCROLL_TOKENS[from_token], SKYDROME_CONTRACTS["router"]
+                )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Swap on Skydrome Error | {e}"
@@ -1,7 +1,6 @@
 import time
 
 from loguru import logger
-from web3 import Web3
 from config import (
     SCROLL_TOKENS,
     SYNCSWAP_CLASSIC_POOL_ABI,
@@ -30,8 +29,8 @@ class SyncSwap(Account):
         )
 
         pool_address = await contract.functions.getPool(
-            Web3.to_checksum_address(SCROLL_TOKENS[from_token]),
-            Web3.to_checksum_address(SCROLL_TOKENS[to_token]),
+            SCROLL_TOKENS[from_token],
+            SCROLL_TOKENS[to_token],
         ).call()
 
         return pool_address
@@ -60,7 +59,7 @@ class SyncSwap(Account):
         min_percent: int,
         max_percent: int,
     ):
-        token_address = Web3.to_checksum_address(SCROLL_TOKENS[from_token])
+        token_address = SCROLL_TOKENS[from_token]
 
         try:
             amount_wei, amount, balance = await self.get_amount(
@@ -88,7 +87,7 @@ class SyncSwap(Account):
                     await self.approve(
                         amount_wei,
                         token_address,
-                        Web3.to_checksum_address(SYNCSWAP_CONTRACTS["router"]),
+                        SYNCSWAP_CONTRACTS["router"],
                     )
 
                 min_amount_out = await self.get_min_amount_out(
@@ -128,6 +127,11 @@ class SyncSwap(Account):
                 txn_hash = await self.send_raw_transaction(signed_txn)
 
                 await self.wait_until_tx_finished(txn_hash.hex())
+
+                if from_token != "ETH":
+                    self.spend_allowance(
+                        amount_wei, token_address, SYNCSWAP_CONTRACTS["router"]
+                    )
             else:
                 logger.error(
                     f"[{self.account_id}][{self.address}] Swap path {from_token} to {to_token} not found!"
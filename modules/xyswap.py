@@ -23,10 +23,10 @@ class XYSwap(Account):
 
         params = {
             "srcChainId": await self.w3.eth.chain_id,
-            "srcQuoteTokenAddress": self.w3.to_checksum_address(from_token),
+            "srcQuoteTokenAddress": from_token,
             "srcQuoteTokenAmount": amount,
             "dstChainId": await self.w3.eth.chain_id,
-            "dstQuoteTokenAddress": self.w3.to_checksum_address(to_token),
+            "dstQuoteTokenAddress": to_token,
             "slippage": slippage,
         }
 
@@ -49,10 +49,10 @@ class XYSwap(Account):
 
         params = {
             "srcChainId": await self.w3.eth.chain_id,
-            "srcQuoteTokenAddress": self.w3.to_checksum_address(from_token),
+            "srcQuoteTokenAddress": from_token,
             "srcQuoteTokenAmount": amount,
             "dstChainId": await self.w3.eth.chain_id,
-            "dstQuoteTokenAddress": self.w3.to_checksum_address(to_token),
+            "dstQuoteTokenAddress": to_token,
             "slippage": slippage,
             "receiver": self.address,
             "srcSwapProvider": swap_provider,
@@ -61,9 +61,7 @@ class XYSwap(Account):
         if XYSWAP_CONTRACT["use_ref"]:
             params.update(
                 {
-                    "affiliate": self.w3.to_checksum_address(
-                        "0x00000D01B969922762a63F3cfD8ec9545DE4d513"
-                    ),
+                    "affiliate": "0x00000D01B969922762a63F3cfD8ec9545DE4d513",
                     "commissionRate": 10000,
                 }
             )
@@ -133,7 +131,6 @@ class XYSwap(Account):
                     "to": self.w3.to_checksum_address(transaction_data["tx"]["to"]),
                     "data": transaction_data["tx"]["data"],
                     "value": transaction_data["tx"]["value"],
-                    "nonce": await self.w3.eth.get_transaction_count(self.address),
                 }
             )
 
@@ -142,6 +139,9 @@ class XYSwap(Account):
             txn_hash = await self.send_raw_transaction(signed_txn)
 
             await self.wait_until_tx_finished(txn_hash.hex())
+
+            if from_token != "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE":
+                self.spend_allowance(amount_wei, from_token, XYSWAP_CONTRACT["router"])
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Swap on XYSwap Error | {e}"
@@ -1,7 +1,6 @@
 import time
 
 from loguru import logger
-from web3 import Web3
 from config import ZEBRA_ROUTER_ABI, ZEBRA_CONTRACTS, SCROLL_TOKENS
 from utils.gas_checker import check_gas
 from utils.helpers import retry
@@ -21,7 +20,7 @@ class Zebra(Account):
     ):
         min_amount_out = await self.swap_contract.functions.getAmountsOut(
             amount,
-            [Web3.to_checksum_address(from_token), Web3.to_checksum_address(to_token)],
+            [from_token, to_token],
         ).call()
         return int(min_amount_out[1] - (min_amount_out[1] / 100 * slippage))
 
@@ -39,8 +38,8 @@ class Zebra(Account):
         contract_txn = await self.swap_contract.functions.swapExactETHForTokens(
             min_amount_out,
             [
-                Web3.to_checksum_address(SCROLL_TOKENS[from_token]),
-                Web3.to_checksum_address(SCROLL_TOKENS[to_token]),
+                SCROLL_TOKENS[from_token],
+                SCROLL_TOKENS[to_token],
             ],
             self.address,
             deadline,
@@ -51,7 +50,7 @@ class Zebra(Account):
     async def swap_to_eth(
         self, from_token: str, to_token: str, amount: int, slippage: int
     ):
-        token_address = Web3.to_checksum_address(SCROLL_TOKENS[from_token])
+        token_address = SCROLL_TOKENS[from_token]
 
         await self.approve(amount, token_address, ZEBRA_CONTRACTS["router"])
 
@@ -67,8 +66,8 @@ class Zebra(Account):
             amount,
             min_amount_out,
             [
-                Web3.to_checksum_address(SCROLL_TOKENS[from_token]),
-                Web3.to_checksum_address(SCROLL_TOKENS[to_token]),
+                SCROLL_TOKENS[from_token],
+                SCROLL_TOKENS[to_token],
             ],
             self.address,
             deadline,
@@ -118,6 +117,11 @@ class Zebra(Account):
             txn_hash = await self.send_raw_transaction(signed_txn)
 
             await self.wait_until_tx_finished(txn_hash.hex())
+
+            if from_token != "ETH":
+                self.spend_allowance(
+                    amount_wei, SCROLL_TOKENS[from_token], ZEBRA_CONTRACTS["router"]
+                )
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Swap on Zebra Error | {e}"
@@ -2,6 +2,7 @@ import random
 from typing import List
 
 from loguru import logger
+from web3.types import TxReceipt
 
 from config import ZERIUS_CONTRACT, ZERIUS_ABI, ZERO_ADDRESS
 from utils.gas_checker import check_gas
@@ -25,12 +26,10 @@ class Zerius(Account):
             "avalanche": 106,
         }
 
-    async def get_nft_id(self, txn_hash: str):
-        receipts = await self.w3.eth.get_transaction_receipt(txn_hash)
+    def get_nft_id(self, receipt: TxReceipt) -> int:
+        transfer = self.decode_events(receipt, self.contract, "Transfer")[0]
 
-        nft_id = int(receipts["logs"][0]["topics"][-1].hex(), 0)
-
-        return nft_id
+        return transfer["args"]["tokenId"]
 
     async def get_estimate_fee(self, chain: str, nft_id: int):
         fee = await self.contract.functions.estimateSendFee(
@@ -55,9 +54,7 @@ class Zerius(Account):
 
             txn_hash = await self.send_raw_transaction(signed_txn)
 
-            await self.wait_until_tx_finished(txn_hash.hex())
-
-            return txn_hash.hex()
+            return await self.wait_until_tx_finished(txn_hash.hex())
         except Exception as e:
             logger.error(
                 f"[{self.account_id}][{self.address}] Mint Zerius NFT Error | {e}"
@@ -73,7 +70,7 @@ class Zerius(Account):
             if not mint_nft:
                 raise Exception("Mint NFT Error")
 
-            nft_id = await self.get_nft_id(mint_nft)
+            nft_id = self.get_nft_id(mint_nft)
 
             await sleep(
                 account_id=self.account_id,
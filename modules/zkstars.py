@@ -34,23 +34,21 @@ class ZkStars(Account):
 
         try:
             for _, contract in enumerate(contracts, start=1):
-                mint_contract = self.get_contract(
-                    self.w3.to_checksum_address(contract), ZKSTARS_ABI
-                )
-
-                mint_price = await mint_contract.functions.getPrice().call()
-                nft_id = await mint_contract.functions.name().call()
+                mint_price = await self.get_function(
+                    contract, "getPrice", ZKSTARS_ABI
+                ).call()
+                nft_id = await self.get_function(contract, "name", ZKSTARS_ABI).call()
 
                 logger.info(f"[{self.account_id}][{self.address}] Mint #{nft_id} NFT")
 
                 tx_data = await self.get_tx_data()
                 tx_data.update({"value": mint_price})
 
-                transaction = await mint_contract.functions.safeMint(
-                    self.w3.to_checksum_address(
-                        "0x1C7FF320aE4327784B464eeD07714581643B36A7"
-                    )
-                ).build_transaction(tx_data)
+                transaction = self.get_function(
+                    contract, "safeMint", ZKSTARS_ABI
+                ).build_transaction(
+                    tx_data, "0x1C7FF320aE4327784B464eeD07714581643B36A7"
+                )
 
                 signed_txn = await self.sign(transaction)
 
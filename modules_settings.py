@@ -1,7 +1,8 @@
 import asyncio
+import enum
+
 from config import AUTOMATIC_MODE
-from modules import *
-from modules.automatic import Automatic, AutomaticModules
+from modules import MODULES_NAMES, AutomaticModules
 from settings import (
     MAX_ALL_AMOUNT_ETH_PERCENT,
     MIN_ALL_AMOUNT_ETH_PERCENT,
@@ -307,7 +308,9 @@ AUTOMATIC_CONFIG = {
     "skip_if_failed": True,  # if swap failed it will be counted as performed after retries
     AutomaticModules.bridge_in: {
         "bridge_in_enabled": True,  # Bridge funds from EVM to scroll or not
-        "bridge_in_service": "orbiter",  # Choose bridge in scroll service: native, nitro, orbiter, layerswap
+        "bridge_in_service": "orbiter",  # Choose bridge in scroll service: native, nitro, orbiter, layerswap, auto
+        # services "auto" chooses from by live fee and settlement time, native needs bridge_in_chain == ethereum
+        "bridge_in_auto_services": ["native", "nitro", "orbiter", "layerswap"],
         # !IMPORTANT NOTICE
         # OKX WILL WITHDRAW FUNDS TO THE bridge_in_chain
         # If bridge_in_service == "native", then ethereum only!
@@ -315,7 +318,9 @@ AUTOMATIC_CONFIG = {
     },
     AutomaticModules.bridge_out: {
         "bridge_out_enabled": True,  # Bridge funds from scroll to EVM or not
-        "bridge_out_service": "orbiter",  # Choose bridge out of scroll service: native, nitro, orbiter, layerswap
+        "bridge_out_service": "orbiter",  # Choose bridge out of scroll service: native, nitro, orbiter, layerswap, auto
+        # services "auto" chooses from by live fee and settlement time, native is never chosen (needs a manual claim on L1)
+        "bridge_out_auto_services": ["nitro", "orbiter", "layerswap"],
         # !IMPORTANT NOTICE
         # OKX WILL DEPOSIT FUNDS FROM THE bridge_out_chain
         # If bridge_out_service == "native", then ethereum only!
@@ -323,6 +328,7 @@ AUTOMATIC_CONFIG = {
     },
     AutomaticModules.swaps: {
         "first_swap_from_eth": False,  # first swap will be from ETH
+        "preapprove_routers": False,  # approve the token of the next swap for its router while sleeping before it
         "services": [
             MODULES_NAMES.swap_skydrome,
             MODULES_NAMES.swap_syncswap,
@@ -423,6 +429,8 @@ async def automatic(account_id, key, okx_address, *args, **kwargs):
     AutomaticModules.layerbank
     """
 
+    from modules.automatic import Automatic
+
     modules = [
         AutomaticModules.swaps,
         AutomaticModules.wrap_unwrap_eth,
@@ -462,6 +470,8 @@ async def okx_deposit(account_id, key, okx_address, *args, **kwargs):
     Deposits ETH only!
     """
 
+    from modules import OKX
+
     config = MODULES_CONFIG[MODULES_NAMES.okx_deposit]
 
     okx = OKX(
@@ -481,6 +491,8 @@ async def okx_deposit(account_id, key, okx_address, *args, **kwargs):
 async def okx_withdraw(account_id, key, *args, **kwargs):
     """Withdraw from OKX"""
 
+    from modules import OKX
+
     config = MODULES_CONFIG[MODULES_NAMES.okx_withdraw]
 
     okx = OKX(
@@ -497,11 +509,24 @@ async def okx_withdraw(account_id, key, *args, **kwargs):
     )
 
 
+async def sweep_okx_subaccounts():
+    """Moves OKX subaccount funds to the main account before withdrawals start"""
+
+    from modules.okx import transfer_from_subaccounts
+
+    config = MODULES_CONFIG[MODULES_NAMES.okx_withdraw]
+
+    if config["transfer_from_subaccounts"]:
+        await transfer_from_subaccounts(config["credentials"])
+
+
 async def deposit_scroll(account_id, key, *args, **kwargs):
     """
     Deposit from official bridge
     """
 
+    from modules import Scroll
+
     config = MODULES_CONFIG[MODULES_NAMES.bridge_in_scroll]
     scroll = Scroll(account_id, key, "ethereum")
     await scroll.deposit(**config)
@@ -512,6 +537,8 @@ async def withdraw_scroll(account_id, key, *args, **kwargs):
     Withdraw from official bridge
     """
 
+    from modules import Scroll
+
     config = MODULES_CONFIG[MODULES_NAMES.bridge_out_scroll]
 
     scroll = Scroll(account_id, key, "scroll")
@@ -523,6 +550,8 @@ async def bridge_orbiter(account_id, key, *args, **kwargs):
     Bridge from orbiter
     """
 
+    from modules import LayerSwap
+
     config = MODULES_CONFIG[MODULES_NAMES.bridge_orbiter]
 
     orbiter = LayerSwap(
@@ -536,6 +565,8 @@ async def bridge_layerswap(account_id, key, *args, **kwargs):
     Bridge from Layerswap
     """
 
+    from modules import LayerSwap
+
     config = MODULES_CONFIG[MODULES_NAMES.bridge_layerswap]
 
     layerswap = LayerSwap(
@@ -549,6 +580,8 @@ async def bridge_nitro(account_id, key, *args, **kwargs):
     Bridge from nitro
     """
 
+    from modules import Nitro
+
     config = MODULES_CONFIG[MODULES_NAMES.bridge_nitro]
 
     nitro = Nitro(
@@ -562,6 +595,8 @@ async def wrap_eth(account_id, key, *args, **kwargs):
     Wrap ETH
     """
 
+    from modules import Scroll
+
     config = MODULES_CONFIG[MODULES_NAMES.wrap_eth]
 
     scroll = Scroll(account_id, key, "scroll")
@@ -573,6 +608,8 @@ async def unwrap_eth(account_id, key, *args, **kwargs):
     Unwrap ETH
     """
 
+    from modules import Scroll
+
     config = MODULES_CONFIG[MODULES_NAMES.unwrap_eth]
 
     scroll = Scroll(account_id, key, "scroll")
@@ -584,6 +621,8 @@ async def swap_skydrome(account_id, key, *args, **kwargs):
     Make swap on Skydrome
     """
 
+    from modules import Skydrome
+
     config = MODULES_CONFIG[MODULES_NAMES.swap_skydrome]
 
     skydrome = Skydrome(account_id, key)
@@ -595,6 +634,8 @@ async def swap_zebra(account_id, key, *args, **kwargs):
     Make swap on Zebra
     """
 
+    from modules import Zebra
+
     config = MODULES_CONFIG[MODULES_NAMES.swap_zebra]
 
     zebra = Zebra(account_id, key)
@@ -606,6 +647,8 @@ async def swap_syncswap(account_id, key, *args, **kwargs):
     Make swap on SyncSwap
     """
 
+    from modules import SyncSwap
+
     config = MODULES_CONFIG[MODULES_NAMES.swap_syncswap]
 
     syncswap = SyncSwap(account_id, key)
@@ -617,6 +660,8 @@ async def swap_xyswap(account_id, key, *args, **kwargs):
     Make swap on XYSwap
     """
 
+    from modules import XYSwap
+
     config = MODULES_CONFIG[MODULES_NAMES.swap_xyswap]
 
     xyswap = XYSwap(account_id, key)
@@ -627,6 +672,8 @@ async def deposit_layerbank(account_id, key, *args, **kwargs):
     """
     Make deposit on LayerBank
     """
+    from modules import LayerBank
+
     config = MODULES_CONFIG[MODULES_NAMES.deposit_layerbank]
 
     layerbank = LayerBank(account_id, key)
@@ -637,6 +684,8 @@ async def deposit_aave(account_id, key, *args, **kwargs):
     """
     Make deposit on Aave
     """
+    from modules import Aave
+
     config = MODULES_CONFIG[MODULES_NAMES.deposit_aave]
 
     aave = Aave(account_id, key)
@@ -648,6 +697,8 @@ async def mint_zerius(account_id, key, *args, **kwargs):
     Mint + bridge Zerius NFT
     """
 
+    from modules import Zerius
+
     config = MODULES_CONFIG[MODULES_NAMES.mint_zerius]
 
     zerius = Zerius(account_id, key)
@@ -659,6 +710,8 @@ async def mint_l2pass(account_id, key, *args, **kwargs):
     Mint L2Pass NFT
     """
 
+    from modules import L2Pass
+
     l2pass = L2Pass(account_id, key)
     await l2pass.mint()
 
@@ -668,6 +721,8 @@ async def mint_nft(account_id, key, *args, **kwargs):
     Mint NFT on NFTS2ME
     """
 
+    from modules import Minter
+
     config = MODULES_CONFIG[MODULES_NAMES.mint_nfts2me]
 
     minter = Minter(account_id, key)
@@ -678,6 +733,8 @@ async def mint_zkstars(account_id, key, *args, **kwargs):
     """
     Mint ZkStars NFT
     """
+    from modules import ZkStars
+
     config = MODULES_CONFIG[MODULES_NAMES.mint_zerius]
 
     zkstars = ZkStars(account_id, key)
@@ -688,6 +745,8 @@ async def send_message(account_id, key, *args, **kwargs):
     """
     Send message with L2Telegraph
     """
+    from modules import L2Telegraph
+
     config = MODULES_CONFIG[MODULES_NAMES.send_message_l2telegraph]
 
     l2telegraph = L2Telegraph(account_id, key)
@@ -698,6 +757,8 @@ async def bridge_nft(account_id, key, *args, **kwargs):
     """
     Make mint NFT and bridge NFT on L2Telegraph
     """
+    from modules import L2Telegraph
+
     config = MODULES_CONFIG[MODULES_NAMES.mint_bridge_l2telegraph]
 
     l2telegraph = L2Telegraph(account_id, key)
@@ -710,40 +771,56 @@ async def bridge_nft(account_id, key, *args, **kwargs):
 
 
 async def withdraw_layerbank(account_id, key, *args, **kwargs):
+    from modules import LayerBank
+
     layerbank = LayerBank(account_id, key)
     await layerbank.withdraw()
 
 
 async def withdraw_aave(account_id, key, *args, **kwargs):
+    from modules import Aave
+
     aave = Aave(account_id, key)
     await aave.withdraw()
 
 
 async def send_mail(account_id, key, *args, **kwargs):
+    from modules import Dmail
+
     dmail = Dmail(account_id, key)
     await dmail.send_mail()
 
 
 async def create_omnisea(account_id, key, *args, **kwargs):
+    from modules import Omnisea
+
     omnisea = Omnisea(account_id, key)
     await omnisea.create()
 
 
 async def create_safe(account_id, key, *args, **kwargs):
+    from modules import GnosisSafe
+
     gnosis_safe = GnosisSafe(account_id, key)
     await gnosis_safe.create_safe()
 
 
 async def deploy_contract(account_id, key, *args, **kwargs):
+    from modules import Deployer
+
     deployer = Deployer(account_id, key)
     await deployer.deploy_token()
 
 
 async def rubyscore_vote(account_id, key, *args, **kwargs):
+    from modules import RubyScore
+
     rubyscore = RubyScore(account_id, key)
     await rubyscore.vote()
 
 
 async def nft_origins(account_id, key, *args, **kwargs):
+    from modules import NftOrigins
+
     nft = NftOrigins(account_id, key)
     await nft.mint()
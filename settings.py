@@ -1,3 +1,4 @@
+# Upper bound of the priority fee in gwei, the fee itself follows recent blocks
 MAX_PRIORITY_FEE = {
     "ethereum": 0.01,
     "polygon": 40,
@@ -34,8 +35,33 @@ MAX_GWEI = 27
 
 THREADS = 2  # Number of threads
 
+SIGNER_THREADS = 4  # Threads that sign transactions off the event loop
+
+PORTFOLIO_CONCURRENCY = 10  # Portfolio scanner requests in flight per chain
+
 GAS_MULTIPLIER = 1.5
 
+# Simulate every transaction with eth_call before signing it (one more call per
+# transaction), reverts that can't succeed on retry are skipped instead of retried
+PREFLIGHT_SIMULATION = False
+
+MAX_FEE_BUMPS = 3  # How many times a stuck transaction is resent with higher fees
+
+# Fee per gas in GWEI a stuck transaction is never bumped past, chains not listed are uncapped
+MAX_FEE_PER_GAS = {
+    "ethereum": 60,
+    "arbitrum": 1,
+    "optimism": 1,
+    "zksync": 1,
+    "base": 1,
+    "scroll": 2,
+    "linea": 5,
+}
+
+# Send a swap or withdraw right after its approve instead of waiting for the approve
+# receipt, the dependent transaction is simulated against the pending state first
+PIPELINE_DEPENDENT_TXS = False
+
 MIN_ALL_AMOUNT_ETH_PERCENT = (
     92  # minimal of how many percents all_amount will swap from ETH
 )
@@ -54,6 +80,9 @@ BRIDGE_FEES = {
     "layerswap": 0.0013,
 }
 
+# ETH one hour of bridge settlement time is worth when the bridge service is "auto"
+BRIDGE_HOUR_COST = 0.0001
+
 OKX_CREDENTIALS = {
     "apikey": "",
     "apisecret": "",
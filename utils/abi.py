@@ -0,0 +1,59 @@
+import atexit
+import json
+import os
+
+
+class AbiCache:
+    """
+    Parsed contract ABIs, kept in one json file.
+
+    Each ABI is parsed from its json file once and stored together with the
+    file's mtime and size, so later runs read one file instead of every ABI.
+    An entry is parsed again when its json file changes. New entries are
+    written once, when the process exits.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.abis = None
+        self.changed = False
+
+    def load(self) -> dict:
+        if self.abis is None:
+            self.abis = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path) as file:
+                        self.abis = json.load(file)
+                except (OSError, ValueError):
+                    self.abis = {}
+
+        return self.abis
+
+    def get(self, abi_path: str) -> list:
+        abis = self.load()
+
+        stat = os.stat(abi_path)
+        version = [stat.st_mtime_ns, stat.st_size]
+
+        if abi_path in abis and abis[abi_path]["version"] == version:
+            return abis[abi_path]["abi"]
+
+        with open(abi_path) as file:
+            abi = json.load(file)
+
+        abis[abi_path] = {"version": version, "abi": abi}
+
+        if not self.changed:
+            self.changed = True
+            atexit.register(self.save)
+
+        return abi
+
+    def save(self) -> None:
+        # other processes may be reading the cache, replace it atomically
+        with open(f"{self.path}.tmp", "w") as file:
+            json.dump(self.abis, file)
+        os.replace(f"{self.path}.tmp", self.path)
+
+        self.changed = False
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from config import TOKENS
+
+
+class AccountState:
+    """
+    Balances of one wallet on one chain.
+
+    Balances only change when a transaction from the wallet lands or when
+    funds arrive from outside (bridges, OKX), so every read between those
+    events is served from this snapshot. `version` counts the invalidations,
+    a balance read that started before the last one is not stored.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.balances = {}
+
+    @staticmethod
+    def _key(contract_address: Optional[str]) -> str:
+        return "ETH" if contract_address is None else contract_address.lower()
+
+    def get(self, contract_address: Optional[str] = None) -> Optional[dict]:
+        balance = self.balances.get(self._key(contract_address))
+        return dict(balance) if balance is not None else None
+
+    def set(
+        self, contract_address: Optional[str], balance: dict, version: int
+    ) -> None:
+        """version - state version the balance read started at"""
+        if version == self.version:
+            self.balances[self._key(contract_address)] = dict(balance)
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.balances.clear()
+
+
+ACCOUNT_STATES = {}
+
+# symbol and decimals never change, so they are fetched once per token,
+# tokens from the config table are known without a call
+TOKEN_METADATA = {
+    ("scroll", token.address): (token.symbol, token.decimals)
+    for token in TOKENS.values()
+    if not token.is_native
+}
+
+
+def get_account_state(chain: str, address: str) -> AccountState:
+    key = (chain, address.lower())
+    if key not in ACCOUNT_STATES:
+        ACCOUNT_STATES[key] = AccountState()
+
+    return ACCOUNT_STATES[key]
@@ -0,0 +1,36 @@
+from typing import Optional
+
+
+class AllowanceCache:
+    """
+    Allowances of our own wallets keyed by (chain, owner, token, spender).
+
+    Allowance of an owner only changes through transactions sent by this
+    software (approves and spends), so after the first read the value is kept
+    up to date locally and served without an RPC call.
+    """
+
+    def __init__(self) -> None:
+        self.allowances = {}
+
+    @staticmethod
+    def _key(chain: str, owner: str, token: str, spender: str) -> tuple:
+        return chain, owner.lower(), token.lower(), spender.lower()
+
+    def get(self, chain: str, owner: str, token: str, spender: str) -> Optional[int]:
+        return self.allowances.get(self._key(chain, owner, token, spender))
+
+    def set(
+        self, chain: str, owner: str, token: str, spender: str, amount: int
+    ) -> None:
+        self.allowances[self._key(chain, owner, token, spender)] = amount
+
+    def spend(
+        self, chain: str, owner: str, token: str, spender: str, amount: int
+    ) -> None:
+        key = self._key(chain, owner, token, spender)
+        if key in self.allowances:
+            self.allowances[key] = max(self.allowances[key] - amount, 0)
+
+
+ALLOWANCES = AllowanceCache()
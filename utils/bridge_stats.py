@@ -0,0 +1,56 @@
+import json
+import os
+from typing import Optional
+
+from config import BRIDGE_STATS_PATH, BRIDGE_STATS_WEIGHT
+
+
+class BridgeStats:
+    """
+    Settlement times of bridges observed on this machine.
+
+    Every arrival updates a moving average per (service, from chain, to chain)
+    route, which the bridge selector uses as the expected latency.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.routes = None
+
+    @staticmethod
+    def _key(service: str, from_chain: str, to_chain: str) -> str:
+        return f"{service}:{from_chain}:{to_chain}"
+
+    def load(self) -> dict:
+        if self.routes is None:
+            self.routes = {}
+            if os.path.exists(self.path):
+                with open(self.path) as file:
+                    self.routes = json.load(file)
+
+        return self.routes
+
+    def get_latency(
+        self, service: str, from_chain: str, to_chain: str
+    ) -> Optional[float]:
+        route = self.load().get(self._key(service, from_chain, to_chain))
+        return route["latency"] if route is not None else None
+
+    def record(self, service: str, from_chain: str, to_chain: str, seconds: float):
+        routes = self.load()
+        key = self._key(service, from_chain, to_chain)
+
+        if key in routes:
+            latency = routes[key]["latency"]
+            routes[key] = {
+                "latency": latency + BRIDGE_STATS_WEIGHT * (seconds - latency),
+                "samples": routes[key]["samples"] + 1,
+            }
+        else:
+            routes[key] = {"latency": seconds, "samples": 1}
+
+        with open(self.path, "w") as file:
+            json.dump(routes, file, indent=4)
+
+
+BRIDGE_STATS = BridgeStats(BRIDGE_STATS_PATH)
@@ -0,0 +1,39 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class TTLCache:
+    """
+    Async cache whose values expire `ttl` seconds after they were fetched.
+
+    Concurrent misses for the same key share a single fetch, so a cold cache
+    costs one request no matter how many accounts ask at once. Failed fetches
+    are not cached.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.values = {}
+        self.fetches = {}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self.values.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+
+        if key not in self.fetches:
+            self.fetches[key] = asyncio.ensure_future(self._fetch(key, fetch))
+
+        return await asyncio.shield(self.fetches[key])
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            self.values[key] = (time.time() + self.ttl, value)
+            return value
+        finally:
+            self.fetches.pop(key, None)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.values.pop(key, None)
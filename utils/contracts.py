@@ -0,0 +1,123 @@
+from functools import lru_cache
+from typing import Any, Union, Type
+
+from eth_typing import ChecksumAddress, HexStr
+from eth_utils import function_abi_to_4byte_selector, to_checksum_address
+from web3 import AsyncWeb3
+from web3._utils.abi import get_abi_input_types, get_abi_output_types, map_abi_data
+from web3._utils.contracts import encode_abi
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract import Contract
+from web3.middleware import async_geth_poa_middleware
+
+
+@lru_cache(maxsize=None)
+def checksum(address: str) -> ChecksumAddress:
+    """to_checksum_address memoized, the same few addresses repeat every step"""
+    return to_checksum_address(address)
+
+
+# (chain, rpc) -> client shared by every account using that endpoint
+WEB3_CLIENTS = {}
+
+
+def get_web3(chain: str, rpc: str) -> AsyncWeb3:
+    if (chain, rpc) not in WEB3_CLIENTS:
+        WEB3_CLIENTS[(chain, rpc)] = AsyncWeb3(
+            AsyncWeb3.AsyncHTTPProvider(rpc),
+            middlewares=[async_geth_poa_middleware],
+        )
+
+    return WEB3_CLIENTS[(chain, rpc)]
+
+
+class FunctionEncoder:
+    """
+    One contract function with its ABI entry, selector and argument types
+    resolved up front, so encoding a call does not search the contract ABI
+    """
+
+    def __init__(self, w3: AsyncWeb3, address: str, fn_abi: dict) -> None:
+        self.w3 = w3
+        self.address = address
+        self.abi = fn_abi
+        self.name = fn_abi["name"]
+        self.selector = HexStr("0x" + function_abi_to_4byte_selector(fn_abi).hex())
+        self.input_types = get_abi_input_types(fn_abi)
+        self.output_types = get_abi_output_types(fn_abi)
+
+    def encode(self, *args) -> HexStr:
+        return encode_abi(self.w3, self.abi, args, self.selector)
+
+    def build_transaction(self, transaction: dict, *args) -> dict:
+        return {**transaction, "to": self.address, "data": self.encode(*args)}
+
+    async def call(self, *args, block_identifier="latest") -> Any:
+        result = await self.w3.eth.call(
+            {"to": self.address, "data": self.encode(*args)}, block_identifier
+        )
+
+        decoded = self.w3.codec.decode(self.output_types, result)
+        decoded = map_abi_data(BASE_RETURN_NORMALIZERS, self.output_types, decoded)
+
+        return decoded[0] if len(decoded) == 1 else decoded
+
+
+class ContractRegistry:
+    """
+    Contract objects and function encoders built once per
+    (chain, rpc, address, ABI) and shared by all accounts.
+
+    Building a web3 contract walks the whole ABI to create its function
+    classes, which is noticeable for big ABIs when done on every call.
+    ABIs are identified by object id, config hands out one object per ABI.
+    """
+
+    def __init__(self) -> None:
+        self.contracts = {}
+        self.functions = {}
+
+    @staticmethod
+    def _key(w3: AsyncWeb3, chain: str, address: str, abi: list) -> tuple:
+        return chain, w3.provider.endpoint_uri, address.lower(), id(abi)
+
+    def get_contract(
+        self, w3: AsyncWeb3, chain: str, address: str, abi: list
+    ) -> Union[Type[Contract], Contract]:
+        key = self._key(w3, chain, address, abi)
+
+        if key not in self.contracts:
+            self.contracts[key] = w3.eth.contract(address=checksum(address), abi=abi)
+
+        return self.contracts[key]
+
+    def get_function(
+        self, w3: AsyncWeb3, chain: str, address: str, abi: list, fn_name: str
+    ) -> FunctionEncoder:
+        key = self._key(w3, chain, address, abi)
+
+        if key not in self.functions:
+            contract = self.get_contract(w3, chain, address, abi)
+
+            functions = {}
+            for fn_abi in contract.abi:
+                if fn_abi.get("type") != "function":
+                    continue
+                encoder = FunctionEncoder(w3, contract.address, fn_abi)
+                functions[encoder.selector] = encoder
+                # overloaded names are only reachable by selector
+                if fn_abi["name"] in functions:
+                    functions[fn_abi["name"]] = None
+                else:
+                    functions[fn_abi["name"]] = encoder
+
+            self.functions[key] = functions
+
+        encoder = self.functions[key].get(fn_name)
+        if encoder is None:
+            raise ValueError(f"No unique function {fn_name} in contract {address}")
+
+        return encoder
+
+
+CONTRACTS = ContractRegistry()
@@ -0,0 +1,59 @@
+from web3 import AsyncWeb3
+
+from config import FEE_HISTORY_BLOCKS, RPC
+from settings import MAX_PRIORITY_FEE
+from utils.cache import TTLCache
+
+
+class FeeStrategy:
+    """
+    Transaction fee fields for one chain.
+
+    EIP-1559 chains pay the configured percentile of the priority fees of the
+    last FEE_HISTORY_BLOCKS blocks, capped by MAX_PRIORITY_FEE, and a fee cap
+    that survives the next block base fee doubling. Chains without EIP-1559
+    pay the node's legacy gas price. Fees are refreshed once per block and
+    shared by every account of the chain.
+    """
+
+    def __init__(self, chain: str) -> None:
+        self.chain = chain
+        self.eip1559 = RPC[chain]["eip1559"]
+        self.priority_percentile = RPC[chain]["priority_percentile"]
+        self.fees = TTLCache(ttl=RPC[chain]["block_time"])
+
+    async def get_fees(self, w3: AsyncWeb3) -> dict:
+        return dict(await self.fees.get(self.chain, lambda: self.load_fees(w3)))
+
+    async def load_fees(self, w3: AsyncWeb3) -> dict:
+        if not self.eip1559:
+            return {"gasPrice": await w3.eth.gas_price}
+
+        history = await w3.eth.fee_history(
+            FEE_HISTORY_BLOCKS, "latest", [self.priority_percentile]
+        )
+
+        rewards = sorted(reward[0] for reward in history["reward"])
+        priority_fee = rewards[len(rewards) // 2]
+        if self.chain in MAX_PRIORITY_FEE:
+            priority_fee = min(
+                priority_fee, w3.to_wei(MAX_PRIORITY_FEE[self.chain], "gwei")
+            )
+
+        # the last entry is the base fee of the next block
+        base_fee = history["baseFeePerGas"][-1]
+
+        return {
+            "maxPriorityFeePerGas": priority_fee,
+            "maxFeePerGas": 2 * base_fee + priority_fee,
+        }
+
+
+FEE_STRATEGIES = {}
+
+
+def get_fee_strategy(chain: str) -> FeeStrategy:
+    if chain not in FEE_STRATEGIES:
+        FEE_STRATEGIES[chain] = FeeStrategy(chain)
+
+    return FEE_STRATEGIES[chain]
@@ -0,0 +1,172 @@
+import enum
+from typing import Optional
+
+import numpy as np
+
+from config import TOKENS
+
+# decimals of each column, the others are 18 decimals amounts
+DECIMALS = {
+    **{symbol: token.decimals for symbol, token in TOKENS.items()},
+    "NONCE": 0,
+}
+
+
+class RouteStage(enum.IntEnum):
+    new = 0
+    okx_withdrawn = 1
+    bridged_in = 2
+    modules_done = 3
+    bridged_out = 4
+    okx_deposited = 5
+
+
+class FleetState:
+    """
+    State of all wallets as columns: one array per (chain, column), indexed
+    by wallet position in data/wallets.txt.
+
+    Filled from a portfolio scan, or only registered with the wallets of an
+    automation run. Balances are float64 wei, NaN where the read failed, since
+    wei amounts above 9.2 ETH overflow int64. The plan_* methods are fleet-wide
+    variants of the per-account decisions in Automatic and answer for every
+    wallet at once.
+
+    OKX withdrawals are planned before the automation starts and Automatic
+    withdraws the planned amount. Bridge out amounts and source tokens depend
+    on balances that change during the run, Automatic decides them per account
+    and the planners only preview them for a scan.
+    """
+
+    def __init__(self) -> None:
+        self.addresses = []
+        self.index = {}
+        self.columns = {}
+        self.progress = np.zeros(0, dtype=np.int8)
+        # plan name -> planned value per wallet
+        self.plans = {}
+
+    def register(self, addresses: list) -> None:
+        """Tracks the wallets of a run without balances"""
+        self.load(addresses, {})
+
+    def load(self, addresses: list, portfolio: dict) -> None:
+        """portfolio - chain -> column -> raw value per wallet, as scanned"""
+        self.addresses = list(addresses)
+        self.index = {address.lower(): i for i, address in enumerate(addresses)}
+        self.progress = np.zeros(len(addresses), dtype=np.int8)
+        self.plans = {}
+
+        self.columns = {
+            (chain, column): np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+            for chain, chain_columns in portfolio.items()
+            for column, values in chain_columns.items()
+        }
+
+    def get(self, chain: str, column: str, units: bool = True) -> np.ndarray:
+        """Column of every wallet, in tokens instead of wei when units is set"""
+        values = self.columns.get((chain, column))
+        if values is None:
+            values = np.full(len(self.addresses), np.nan)
+
+        if units:
+            return values / 10 ** DECIMALS.get(column, 18)
+
+        return values
+
+    def set_progress(self, address: str, stage: RouteStage) -> None:
+        i = self.index.get(address.lower())
+        if i is not None:
+            self.progress[i] = max(self.progress[i], stage)
+
+    def get_plan(self, name: str, address: str) -> Optional[float]:
+        """Planned value of the wallet, None if it wasn't planned"""
+        i = self.index.get(address.lower())
+        if name not in self.plans or i is None or np.isnan(self.plans[name][i]):
+            return None
+
+        return float(self.plans[name][i])
+
+    def plan_okx_withdrawals(
+        self,
+        min_amount: float,
+        max_amount: float,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        """ETH each wallet withdraws from OKX, as OKX.withdraw sizes it"""
+        rng = rng or np.random.default_rng()
+
+        amounts = np.round(rng.uniform(min_amount, max_amount, len(self.addresses)), 6)
+        self.plans["okx_withdraw"] = amounts
+
+        return amounts
+
+    def plan_bridge_out(
+        self,
+        min_leave: float,
+        max_leave: float,
+        chain: str = "scroll",
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        """
+        ETH each wallet bridges out, like Automatic.get_amount_to_bridge_out.
+        NaN marks wallets without enough ETH or without a balance read.
+        """
+        rng = rng or np.random.default_rng()
+
+        balance = self.get(chain, "ETH")
+        amount_to_leave = np.round(
+            rng.uniform(min_leave, max_leave, len(self.addresses)), 5
+        )
+
+        with np.errstate(invalid="ignore"):
+            enough = balance > amount_to_leave
+
+        return np.where(enough, balance - amount_to_leave, np.nan)
+
+    def choose_src_tokens(
+        self,
+        min_balances: dict,
+        first_swap_from_eth: bool = False,
+        performed_quantity=0,
+        chain: str = "scroll",
+    ) -> np.ndarray:
+        """
+        Symbol each wallet swaps from, like Automatic.choose_src_token: the
+        token with the largest balance in wei that is above its minimal
+        balance, ETH when there is none.
+
+        min_balances - symbol -> minimal balance in tokens
+        performed_quantity - swaps already made, one number or one per wallet
+        """
+        symbols = [symbol for symbol in min_balances if symbol != "ETH"]
+        if not symbols:
+            return np.full(len(self.addresses), "ETH", dtype=object)
+
+        balances = np.stack(
+            [self.get(chain, symbol, units=False) for symbol in symbols]
+        )
+        minimums = np.array(
+            [min_balances[symbol] * 10 ** DECIMALS[symbol] for symbol in symbols]
+        )
+
+        with np.errstate(invalid="ignore"):
+            eligible = balances >= minimums[:, None]
+
+        scores = np.where(eligible, balances, -np.inf)
+        best = np.argmax(scores, axis=0)
+
+        chosen = np.array(symbols, dtype=object)[best]
+        chosen[~eligible.any(axis=0)] = "ETH"
+
+        if first_swap_from_eth:
+            first_swap = np.asarray(performed_quantity) == 0
+            chosen[np.broadcast_to(first_swap, chosen.shape)] = "ETH"
+
+        return chosen
+
+
+FLEET = FleetState()
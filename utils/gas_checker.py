@@ -3,8 +3,6 @@ import threading
 import time
 import random
 
-from web3 import AsyncWeb3, Web3
-from web3.middleware import async_geth_poa_middleware
 from config import RPC
 from settings import CHECK_GWEI, MAX_GWEI
 from loguru import logger
@@ -16,6 +14,8 @@ lock = asyncio.Lock()
 
 
 def get_gas():
+    from web3 import Web3
+
     try:
         w3 = Web3(
             Web3.HTTPProvider(random.choice(RPC["ethereum"]["rpc"])),
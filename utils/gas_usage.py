@@ -0,0 +1,93 @@
+import json
+import math
+import os
+from typing import Optional, Union
+
+from hexbytes import HexBytes
+
+from config import (
+    GAS_USAGE_EXCLUDED_CHAINS,
+    GAS_USAGE_MARGIN,
+    GAS_USAGE_MIN_SAMPLES,
+    GAS_USAGE_PATH,
+    GAS_USAGE_SAMPLES,
+    GAS_USAGE_SAVE_EVERY,
+)
+
+
+class GasUsage:
+    """
+    Gas used by our own transactions, per (chain, contract, selector).
+
+    Every successful receipt adds a sample. Once a call has enough samples its
+    gas limit is the 99th percentile of them plus GAS_USAGE_MARGIN and the
+    estimate is skipped. The margin also covers the refunds receipts report gas
+    used after. Samples are written every GAS_USAGE_SAVE_EVERY receipts and on
+    save().
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.samples = None
+        self.unsaved = 0
+
+    @staticmethod
+    def _key(chain: str, to: Optional[str], data: Union[str, bytes, None]) -> str:
+        selector = HexBytes(data)[:4].hex() if data else "0x"
+        return f"{chain}:{(to or '').lower()}:{selector}"
+
+    def load(self) -> dict:
+        if self.samples is None:
+            self.samples = {}
+            if os.path.exists(self.path):
+                with open(self.path) as file:
+                    self.samples = json.load(file)
+
+        return self.samples
+
+    def get_gas_limit(
+        self, chain: str, to: Optional[str], data: Union[str, bytes, None]
+    ) -> Optional[int]:
+        """Learned gas limit of the call, None until it has enough samples"""
+        if chain in GAS_USAGE_EXCLUDED_CHAINS:
+            return None
+
+        samples = self.load().get(self._key(chain, to, data), [])
+        if len(samples) < GAS_USAGE_MIN_SAMPLES:
+            return None
+
+        samples = sorted(samples)
+        p99 = samples[math.ceil(len(samples) * 0.99) - 1]
+
+        return int(p99 * (1 + GAS_USAGE_MARGIN))
+
+    def record(
+        self,
+        chain: str,
+        to: Optional[str],
+        data: Union[str, bytes, None],
+        gas_used: int,
+    ):
+        if chain in GAS_USAGE_EXCLUDED_CHAINS:
+            return
+
+        samples = self.load()
+        key = self._key(chain, to, data)
+
+        samples[key] = (samples.get(key, []) + [gas_used])[-GAS_USAGE_SAMPLES:]
+
+        self.unsaved += 1
+        if self.unsaved >= GAS_USAGE_SAVE_EVERY:
+            self.save()
+
+    def save(self) -> None:
+        if not self.unsaved:
+            return
+
+        with open(self.path, "w") as file:
+            json.dump(self.samples, file)
+
+        self.unsaved = 0
+
+
+GAS_USAGE = GasUsage(GAS_USAGE_PATH)
@@ -11,6 +11,10 @@ from asyncio import sleep
 from config import AUTOMATIC_MODE
 
 
+class FatalTransactionError(Exception):
+    """The transaction is known to fail, retrying it only wastes gas and time"""
+
+
 def retry(func):
     async def wrapper(*args, **kwargs):
         retries = 0
@@ -18,6 +22,9 @@ def retry(func):
             try:
                 result = await func(*args, **kwargs)
                 return result
+            except FatalTransactionError as e:
+                logger.error(f"Error | {e}")
+                raise e
             except Exception as e:
                 logger.error(f"Error | {e}")
                 if str(e).startswith("520, "):
@@ -0,0 +1,265 @@
+import asyncio
+import csv
+import random
+from typing import Optional
+
+import aiohttp
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+from loguru import logger
+from tabulate import tabulate
+
+from config import (
+    AAVE_WETH_CONTRACT,
+    LAYERBANK_WETH_CONTRACT,
+    MULTICALL_BATCH_SIZE,
+    MULTICALL_CONTRACTS,
+    MULTICALLS_PER_REQUEST,
+    PORTFOLIO_CSV_PATH,
+    PORTFOLIO_RETRIES,
+    PORTFOLIO_RETRY_DELAY,
+    RPC,
+    TOKENS,
+)
+from settings import PORTFOLIO_CONCURRENCY
+from utils.rpc import MAX_BATCH_SIZE, batch_call
+
+AGGREGATE3 = function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])")
+GET_ETH_BALANCE = function_signature_to_4byte_selector("getEthBalance(address)")
+BALANCE_OF = function_signature_to_4byte_selector("balanceOf(address)")
+
+# column -> (token contract, decimals), positions that only exist on Scroll
+SCROLL_POSITIONS = {
+    **{
+        symbol: (token.address, token.decimals)
+        for symbol, token in TOKENS.items()
+        if not token.is_native
+    },
+    "AAVE": (AAVE_WETH_CONTRACT, 18),
+    "LAYERBANK": (LAYERBANK_WETH_CONTRACT, 18),
+}
+
+
+class PortfolioScanner:
+    """
+    Read-only snapshot of every wallet on every chain.
+
+    Balances are read through Multicall3, MULTICALL_BATCH_SIZE of them per
+    eth_call, and nonces through JSON-RPC batches. Chains are scanned in
+    parallel with at most PORTFOLIO_CONCURRENCY requests in flight per chain.
+    Failed reads are retried with backoff, the wallets of reads that still
+    fail are left empty.
+    """
+
+    def __init__(self, addresses: list, chains: Optional[list] = None) -> None:
+        self.addresses = addresses
+        self.chains = chains if chains is not None else list(RPC)
+
+    @staticmethod
+    def get_positions(chain: str) -> dict:
+        positions = {"ETH": (MULTICALL_CONTRACTS[chain], 18)}
+        if chain == "scroll":
+            positions.update(SCROLL_POSITIONS)
+
+        return positions
+
+    @staticmethod
+    def encode_multicall(chain: str, calls: list) -> tuple:
+        data = AGGREGATE3 + encode(
+            ["(address,bool,bytes)[]"],
+            [[(target, True, call_data) for target, call_data in calls]],
+        )
+
+        return "eth_call", [
+            {"to": MULTICALL_CONTRACTS[chain], "data": "0x" + data.hex()},
+            "latest",
+        ]
+
+    @staticmethod
+    def decode_multicall(result: str) -> list:
+        """uint256 results of an aggregate3 call, None for failed calls"""
+        (results,) = decode(["(bool,bytes)[]"], bytes.fromhex(result[2:]))
+
+        return [
+            int.from_bytes(data[:32], "big") if success and len(data) >= 32 else None
+            for success, data in results
+        ]
+
+    async def request(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        chain: str,
+        calls: list,
+    ) -> list:
+        """Results of the calls, None for the ones that failed every retry"""
+        results = [None] * len(calls)
+        failed = list(range(len(calls)))
+
+        for attempt in range(PORTFOLIO_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(PORTFOLIO_RETRY_DELAY * 2 ** (attempt - 1))
+
+            try:
+                async with semaphore:
+                    retried = await batch_call(
+                        session,
+                        random.choice(RPC[chain]["rpc"]),
+                        [calls[i] for i in failed],
+                        strict=False,
+                    )
+            except Exception as error:
+                logger.debug(f"Portfolio scan of {chain} request failed | {error}")
+                continue
+
+            for i, result in zip(failed, retried):
+                results[i] = result
+
+            failed = [i for i in failed if results[i] is None]
+            if not failed:
+                break
+
+        if failed:
+            logger.warning(
+                f"Portfolio scan of {chain} | {len(failed)} reads failed after {PORTFOLIO_RETRIES} retries"
+            )
+
+        return results
+
+    async def scan_chain(self, session: aiohttp.ClientSession, chain: str) -> dict:
+        """column -> raw value per wallet, None where the read failed"""
+        semaphore = asyncio.Semaphore(PORTFOLIO_CONCURRENCY)
+        positions = self.get_positions(chain)
+
+        # the only argument is an address, left padded to 32 bytes
+        arguments = [
+            bytes(12) + bytes.fromhex(address[2:]) for address in self.addresses
+        ]
+
+        reads = []
+        for column, (contract, _) in positions.items():
+            selector = GET_ETH_BALANCE if column == "ETH" else BALANCE_OF
+            reads.extend((contract, selector + argument) for argument in arguments)
+
+        multicalls = [
+            self.encode_multicall(chain, reads[start : start + MULTICALL_BATCH_SIZE])
+            for start in range(0, len(reads), MULTICALL_BATCH_SIZE)
+        ]
+        nonce_calls = [
+            ("eth_getTransactionCount", [address, "latest"])
+            for address in self.addresses
+        ]
+
+        multicall_results, nonce_results = await asyncio.gather(
+            asyncio.gather(
+                *[
+                    self.request(
+                        session,
+                        semaphore,
+                        chain,
+                        multicalls[start : start + MULTICALLS_PER_REQUEST],
+                    )
+                    for start in range(0, len(multicalls), MULTICALLS_PER_REQUEST)
+                ]
+            ),
+            asyncio.gather(
+                *[
+                    self.request(
+                        session,
+                        semaphore,
+                        chain,
+                        nonce_calls[start : start + MAX_BATCH_SIZE],
+                    )
+                    for start in range(0, len(nonce_calls), MAX_BATCH_SIZE)
+                ]
+            ),
+        )
+
+        values = []
+        results = [result for results in multicall_results for result in results]
+        for start, result in zip(range(0, len(reads), MULTICALL_BATCH_SIZE), results):
+            if result is None:
+                # every read of a failed aggregate3 call stays empty
+                values.extend([None] * len(reads[start : start + MULTICALL_BATCH_SIZE]))
+            else:
+                values.extend(self.decode_multicall(result))
+
+        wallets = len(self.addresses)
+        columns = {
+            column: values[i * wallets : (i + 1) * wallets]
+            for i, column in enumerate(positions)
+        }
+        columns["NONCE"] = [
+            None if nonce is None else int(nonce, 16)
+            for results in nonce_results
+            for nonce in results
+        ]
+
+        return columns
+
+    async def scan(self) -> dict:
+        """chain -> column -> raw value per wallet, failed chains are skipped"""
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(
+                *[self.scan_chain(session, chain) for chain in self.chains],
+                return_exceptions=True,
+            )
+
+        portfolio = {}
+        for chain, result in zip(self.chains, results):
+            if isinstance(result, Exception):
+                logger.error(f"Portfolio scan of {chain} failed | {result}")
+            else:
+                portfolio[chain] = result
+
+        return portfolio
+
+    def write_csv(self, portfolio: dict, path: str = PORTFOLIO_CSV_PATH) -> None:
+        columns = ["ETH", *SCROLL_POSITIONS, "NONCE"]
+        missing = [None] * len(self.addresses)
+
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["wallet", "address", "chain", *columns])
+
+            for chain, values in portfolio.items():
+                decimals = {
+                    column: position[1]
+                    for column, position in self.get_positions(chain).items()
+                }
+                for i, address in enumerate(self.addresses):
+                    row = []
+                    for column in columns:
+                        value = values.get(column, missing)[i]
+                        if value is not None and column in decimals:
+                            value = value / 10 ** decimals[column]
+                        row.append("" if value is None else value)
+
+                    writer.writerow([i + 1, address, chain, *row])
+
+    def get_summary(self, portfolio: dict) -> str:
+        rows = []
+        for chain, values in portfolio.items():
+            for column, (_, decimal) in self.get_positions(chain).items():
+                amounts = [value for value in values[column] if value]
+                rows.append([chain, column, len(amounts), sum(amounts) / 10**decimal])
+
+        return tabulate(
+            rows, headers=["chain", "asset", "wallets", "total"], floatfmt=".6f"
+        )
+
+
+async def scan_portfolio(addresses: list) -> dict:
+    scanner = PortfolioScanner(addresses)
+
+    logger.info(f"Scanning {len(addresses)} wallets on {len(scanner.chains)} chains")
+
+    portfolio = await scanner.scan()
+
+    scanner.write_csv(portfolio)
+
+    logger.info(
+        f"Portfolio saved to {PORTFOLIO_CSV_PATH}\n{scanner.get_summary(portfolio)}"
+    )
+
+    return portfolio
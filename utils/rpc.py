@@ -0,0 +1,41 @@
+import aiohttp
+
+# most public RPCs reject batches larger than this
+MAX_BATCH_SIZE = 100
+
+
+async def batch_call(
+    session: aiohttp.ClientSession, rpc: str, calls: list, strict: bool = True
+) -> list:
+    """
+    Sends (method, params) calls as JSON-RPC batches and returns their results
+    in the same order. A failed call raises, since callers treat a batch as
+    one read, unless strict is False, then its result is None. A response
+    that is not a batch always raises.
+    """
+    results = []
+
+    for start in range(0, len(calls), MAX_BATCH_SIZE):
+        chunk = calls[start : start + MAX_BATCH_SIZE]
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(chunk)
+        ]
+
+        async with session.post(rpc, json=payload) as response:
+            data = await response.json(content_type=None)
+
+        if not isinstance(data, list):
+            raise Exception(f"Batch request failed | {data}")
+
+        chunk_results = [None] * len(chunk)
+        for item in data:
+            if "error" in item:
+                if strict:
+                    raise Exception(f"Batch request failed | {item['error']}")
+                continue
+            chunk_results[item["id"]] = item["result"]
+
+        results.extend(chunk_results)
+
+    return results
@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_account import Account as EthereumAccount
+from eth_account.datastructures import SignedTransaction
+from eth_account.signers.local import LocalAccount
+
+from settings import SIGNER_THREADS
+
+
+class Signer:
+    """
+    Key derivation and transaction signing for all wallets.
+
+    Every private key is turned into an account object once. Accounts are
+    cached by address, the key itself is only remembered as a digest pointing
+    to that address. Signing runs in a thread pool, so secp256k1 math does not
+    stall the event loop.
+    """
+
+    def __init__(self, threads: int) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="signer"
+        )
+        self.addresses = {}
+        self.accounts = {}
+
+    @staticmethod
+    def _digest(private_key: str) -> str:
+        private_key = private_key.lower().removeprefix("0x")
+        return hashlib.sha256(private_key.encode()).hexdigest()
+
+    def get_account(self, private_key: str) -> LocalAccount:
+        digest = self._digest(private_key)
+
+        if digest not in self.addresses:
+            account = EthereumAccount.from_key(private_key)
+            self.addresses[digest] = account.address
+            self.accounts[account.address] = account
+
+        return self.accounts[self.addresses[digest]]
+
+    async def sign(self, address: str, transaction: dict) -> SignedTransaction:
+        return (await self.sign_many(address, [transaction]))[0]
+
+    async def sign_many(
+        self, address: str, transactions: list
+    ) -> list[SignedTransaction]:
+        """Signs several transactions of one wallet in a single pool job"""
+        account = self.accounts[address]
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            lambda: [account.sign_transaction(tx) for tx in transactions],
+        )
+
+
+SIGNER = Signer(SIGNER_THREADS)
@@ -0,0 +1,394 @@
+import asyncio
+import random
+from typing import Callable, Optional
+
+import aiohttp
+from loguru import logger
+
+from config import LOG_WATCHER_LOOKBACK, LOG_WATCHER_MAX_BLOCKS, RPC
+from utils.rpc import MAX_BATCH_SIZE, batch_call
+
+# blocks fetched in one poll, a watcher that fell further behind catches up
+# over the next polls
+MAX_BLOCKS_PER_POLL = MAX_BATCH_SIZE
+
+
+class ArrivalWatcher:
+    """
+    Detects incoming transfers to all watched wallets of one chain.
+
+    Plain transfers leave no logs, so they are found in the transactions of
+    the blocks made since the last poll. Those blocks are only fetched when
+    the balance of a watched wallet went up since the previous poll, which
+    one batched eth_getBalance request tells. One scan serves every account.
+    Only top-level transfers are visible here, bridges that pay out through
+    internal calls (native Scroll bridge, Nitro) are matched by LogWatcher.
+    """
+
+    def __init__(self, chain: str) -> None:
+        self.chain = chain
+        self.block_time = RPC[chain]["block_time"]
+        self.rpc = random.choice(RPC[chain]["rpc"])
+
+        self.watches = {}
+        # address -> balance at last_block
+        self.balances = {}
+        self.last_block = None
+        self.task = None
+
+    def watch(
+        self, address: str, min_value: int, senders: Optional[list] = None
+    ) -> asyncio.Future:
+        """
+        Returns a future resolved with the first transaction that sends at least
+        min_value to address, optionally only from one of senders
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        if senders is not None:
+            senders = {sender.lower() for sender in senders}
+
+        self.watches.setdefault(address.lower(), []).append(
+            (min_value, senders, future)
+        )
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+        return future
+
+    async def run(self):
+        async with aiohttp.ClientSession() as session:
+            while True:
+                # waits that timed out are cancelled, nothing is fetched for them
+                self.remove_done()
+                if not self.watches:
+                    break
+
+                try:
+                    await self.scan(session)
+                except Exception as error:
+                    logger.error(f"[{self.chain}] Arrival watcher error | {error}")
+
+                self.remove_done()
+                await asyncio.sleep(self.block_time)
+
+        self.last_block = None
+        self.balances = {}
+
+    async def scan(self, session: aiohttp.ClientSession):
+        (latest,) = await batch_call(session, self.rpc, [("eth_blockNumber", [])])
+        latest = int(latest, 16)
+
+        if self.last_block is None:
+            self.last_block = latest - 1
+
+        to_block = min(latest, self.last_block + MAX_BLOCKS_PER_POLL)
+        if to_block <= self.last_block:
+            return
+
+        addresses = list(self.watches)
+        balances = await batch_call(
+            session,
+            self.rpc,
+            [("eth_getBalance", [address, hex(to_block)]) for address in addresses],
+        )
+        balances = {
+            address: int(balance, 16) for address, balance in zip(addresses, balances)
+        }
+
+        # a wallet without a previous balance may have received something too
+        received = any(
+            balance > self.balances.get(address, -1)
+            for address, balance in balances.items()
+        )
+        if received:
+            blocks = await batch_call(
+                session,
+                self.rpc,
+                [
+                    ("eth_getBlockByNumber", [hex(number), True])
+                    for number in range(self.last_block + 1, to_block + 1)
+                ],
+            )
+
+            for block in blocks:
+                # not available on this node yet, the next poll starts from it
+                # and compares with the old balances again
+                if block is None:
+                    return
+
+                self.match(block["transactions"])
+                self.last_block = int(block["number"], 16)
+
+        self.balances.update(balances)
+        self.last_block = to_block
+
+    def match(self, transactions: list):
+        """transactions - raw JSON-RPC transactions, with hex encoded values"""
+        for tx in transactions:
+            if tx["to"] is None or tx["to"].lower() not in self.watches:
+                continue
+
+            for min_value, senders, future in self.watches[tx["to"].lower()]:
+                if future.done() or int(tx["value"], 16) < min_value:
+                    continue
+                if senders is not None and tx["from"].lower() not in senders:
+                    continue
+
+                future.set_result(tx)
+                break
+
+    def remove_done(self):
+        for address in list(self.watches):
+            self.watches[address] = [
+                watch for watch in self.watches[address] if not watch[2].done()
+            ]
+            if not self.watches[address]:
+                del self.watches[address]
+                self.balances.pop(address, None)
+
+
+ARRIVAL_WATCHERS = {}
+
+
+def get_arrival_watcher(chain: str) -> ArrivalWatcher:
+    if chain not in ARRIVAL_WATCHERS:
+        ARRIVAL_WATCHERS[chain] = ArrivalWatcher(chain)
+
+    return ARRIVAL_WATCHERS[chain]
+
+
+def address_topic(address: str) -> str:
+    """Log topic of an indexed address argument"""
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+class LogWatcher:
+    """
+    Waits for payout events of all in-flight bridges of one chain.
+
+    Watches of the same contract and event share one eth_getLogs filter,
+    with the indexed arguments of all of them (the watched wallets) as
+    alternatives, and every filter is sent in one batched request per poll
+    over the blocks made since the last one. A new watch searches the last
+    LOG_WATCHER_LOOKBACK seconds of blocks too, a payout may land before
+    the watch is made.
+    """
+
+    def __init__(self, chain: str) -> None:
+        self.chain = chain
+        self.block_time = RPC[chain]["block_time"]
+        self.rpc = random.choice(RPC[chain]["rpc"])
+        self.lookback_blocks = LOG_WATCHER_LOOKBACK // self.block_time
+
+        self.watches = {}
+        self.last_block = None
+        self.task = None
+
+    def watch(
+        self,
+        contract: str,
+        topics: list,
+        match: Optional[Callable[[dict], bool]] = None,
+    ) -> asyncio.Future:
+        """
+        Returns a future resolved with the first log of contract that has the
+        topics (None matches any topic) and passes match, a check of the raw
+        JSON-RPC log
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        topics = [topic.lower() if topic is not None else None for topic in topics]
+        self.watches.setdefault((contract.lower(), topics[0]), []).append(
+            (topics, match, future)
+        )
+        # the next poll starts from the lookback again
+        self.last_block = None
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+        return future
+
+    async def run(self):
+        async with aiohttp.ClientSession() as session:
+            while True:
+                self.remove_done()
+                if not self.watches:
+                    break
+
+                try:
+                    await self.scan(session)
+                except Exception as error:
+                    logger.error(f"[{self.chain}] Log watcher error | {error}")
+
+                self.remove_done()
+                await asyncio.sleep(self.block_time)
+
+        self.last_block = None
+
+    def get_filters(self) -> list:
+        """One (address, topics) filter per watched event of a contract"""
+        filters = []
+
+        for (contract, topic), watches in self.watches.items():
+            size = max(len(watch[0]) for watch in watches)
+            topics = [topic]
+            for position in range(1, size):
+                alternatives = {
+                    watch[0][position] if position < len(watch[0]) else None
+                    for watch in watches
+                }
+                topics.append(None if None in alternatives else sorted(alternatives))
+
+            filters.append((contract, topics))
+
+        return filters
+
+    async def scan(self, session: aiohttp.ClientSession):
+        (latest,) = await batch_call(session, self.rpc, [("eth_blockNumber", [])])
+        latest = int(latest, 16)
+
+        if self.last_block is None:
+            self.last_block = max(latest - self.lookback_blocks, 0)
+
+        to_block = min(latest, self.last_block + LOG_WATCHER_MAX_BLOCKS)
+        if to_block <= self.last_block:
+            return
+
+        results = await batch_call(
+            session,
+            self.rpc,
+            [
+                (
+                    "eth_getLogs",
+                    [
+                        {
+                            "fromBlock": hex(self.last_block + 1),
+                            "toBlock": hex(to_block),
+                            "address": contract,
+                            "topics": topics,
+                        }
+                    ],
+                )
+                for contract, topics in self.get_filters()
+            ],
+        )
+
+        for logs in results:
+            self.match(logs)
+
+        self.last_block = to_block
+
+    def match(self, logs: list):
+        """logs - raw JSON-RPC logs, with hex encoded topics and data"""
+        for log in logs:
+            topics = [topic.lower() for topic in log["topics"]]
+            if not topics:
+                continue
+
+            for watch_topics, match, future in self.watches.get(
+                (log["address"].lower(), topics[0]), []
+            ):
+                if future.done() or len(watch_topics) > len(topics):
+                    continue
+                if any(
+                    topic is not None and topic != topics[position]
+                    for position, topic in enumerate(watch_topics)
+                ):
+                    continue
+                if match is not None and not match(log):
+                    continue
+
+                future.set_result(log)
+                break
+
+    def remove_done(self):
+        for key in list(self.watches):
+            self.watches[key] = [
+                watch for watch in self.watches[key] if not watch[2].done()
+            ]
+            if not self.watches[key]:
+                del self.watches[key]
+
+
+LOG_WATCHERS = {}
+
+
+def get_log_watcher(chain: str) -> LogWatcher:
+    if chain not in LOG_WATCHERS:
+        LOG_WATCHERS[chain] = LogWatcher(chain)
+
+    return LOG_WATCHERS[chain]
+
+
+class BalanceWatcher:
+    """
+    Waits for ETH balances of all in-flight bridges of one chain.
+
+    All watched addresses are read with one batched eth_getBalance request
+    per block and every watch whose target is reached is resolved.
+    """
+
+    def __init__(self, chain: str) -> None:
+        self.chain = chain
+        self.block_time = RPC[chain]["block_time"]
+        self.rpc = random.choice(RPC[chain]["rpc"])
+
+        self.watches = {}
+        self.task = None
+
+    def watch(self, address: str, target_wei: int) -> asyncio.Future:
+        """Returns a future resolved with the balance once it reaches target_wei"""
+        future = asyncio.get_running_loop().create_future()
+
+        self.watches.setdefault(address.lower(), []).append((target_wei, future))
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+        return future
+
+    async def run(self):
+        async with aiohttp.ClientSession() as session:
+            while self.watches:
+                addresses = list(self.watches)
+
+                try:
+                    balances = await batch_call(
+                        session,
+                        self.rpc,
+                        [("eth_getBalance", [address, "latest"]) for address in addresses],
+                    )
+                except Exception as error:
+                    logger.error(f"[{self.chain}] Balance watcher error | {error}")
+                else:
+                    for address, balance in zip(addresses, balances):
+                        self.match(address, int(balance, 16))
+
+                self.remove_done()
+                await asyncio.sleep(self.block_time)
+
+    def match(self, address: str, balance: int):
+        for target_wei, future in self.watches.get(address, []):
+            if not future.done() and balance >= target_wei:
+                future.set_result(balance)
+
+    def remove_done(self):
+        for address in list(self.watches):
+            self.watches[address] = [
+                watch for watch in self.watches[address] if not watch[1].done()
+            ]
+            if not self.watches[address]:
+                del self.watches[address]
+
+
+BALANCE_WATCHERS = {}
+
+
+def get_balance_watcher(chain: str) -> BalanceWatcher:
+    if chain not in BALANCE_WATCHERS:
+        BALANCE_WATCHERS[chain] = BalanceWatcher(chain)
+
+    return BALANCE_WATCHERS[chain]